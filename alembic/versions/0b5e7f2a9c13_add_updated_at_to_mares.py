@@ -0,0 +1,48 @@
+"""add updated_at to mares
+
+Revision ID: 0b5e7f2a9c13
+Revises: f2d6a8c41b97
+Create Date: 2026-10-18 16:48:55.102736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b5e7f2a9c13'
+down_revision: Union[str, None] = 'f2d6a8c41b97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # now() is stable, so Postgres stores the default once instead of
+    # rewriting the table; existing rows all get the migration time.
+    op.add_column(
+        'mares',
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_mares_user_owner_updated_at',
+            'mares',
+            ['user_owner', 'updated_at', 'id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_mares_user_owner_updated_at', 'mares', postgresql_concurrently=True)
+
+    op.drop_column('mares', 'updated_at')
@@ -0,0 +1,40 @@
+"""add claim columns to outbox_events
+
+Revision ID: 3f8a2c6d1e54
+Revises: 9e4c1b7d2f68
+Create Date: 2026-10-18 21:02:37.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a2c6d1e54'
+down_revision: Union[str, None] = '9e4c1b7d2f68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'outbox_events',
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.add_column(
+        'outbox_events',
+        sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        'outbox_events',
+        sa.Column('failed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('outbox_events', 'failed_at')
+    op.drop_column('outbox_events', 'claimed_at')
+    op.drop_column('outbox_events', 'attempts')
@@ -0,0 +1,59 @@
+"""add indexes to mares
+
+Revision ID: 5b2e9c4a1f73
+Revises: 17f865ccbb01
+Create Date: 2026-10-18 10:12:41.208315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e9c4a1f73'
+down_revision: Union[str, None] = '17f865ccbb01'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction block. The unique index
+    # fails if a user already has two mares with the same name; those rows
+    # must be renamed or removed before upgrading.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_mares_user_owner_mare_type',
+            'mares',
+            ['user_owner', 'mare_type', 'mare_name', 'id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'uq_mares_user_owner_mare_name',
+            'mares',
+            ['user_owner', 'mare_name'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_mares_user_owner_pregnancy_date',
+            'mares',
+            ['user_owner', 'pregnancy_date', 'id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_mares_user_owner_birth_forecast',
+            'mares',
+            ['user_owner', sa.text("(timezone('UTC', pregnancy_date) + interval '335 days')")],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_mares_user_owner_birth_forecast', 'mares', postgresql_concurrently=True)
+        op.drop_index('ix_mares_user_owner_pregnancy_date', 'mares', postgresql_concurrently=True)
+        op.drop_index('uq_mares_user_owner_mare_name', 'mares', postgresql_concurrently=True)
+        op.drop_index('ix_mares_user_owner_mare_type', 'mares', postgresql_concurrently=True)
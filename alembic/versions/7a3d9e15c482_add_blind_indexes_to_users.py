@@ -0,0 +1,57 @@
+"""add blind indexes to users
+
+Revision ID: 7a3d9e15c482
+Revises: 0b5e7f2a9c13
+Create Date: 2026-10-18 18:07:32.915480
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3d9e15c482'
+down_revision: Union[str, None] = '0b5e7f2a9c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fill them afterwards with `python -m equigest.infra.backfill_user_blind_indexes`
+    op.add_column('users', sa.Column('cellphone_blind_index', sa.String(), nullable=True))
+    op.add_column('users', sa.Column('cpf_cnpj_blind_index', sa.String(), nullable=True))
+
+    # The ciphertexts are randomized, so the old constraints could never
+    # reject a duplicate and only cost index maintenance.
+    op.drop_constraint('uq_users_cpf_cnpj', 'users', type_='unique')
+    op.drop_constraint('uq_users_cellphone', 'users', type_='unique')
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_users_cellphone_blind_index',
+            'users',
+            ['cellphone_blind_index'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'uq_users_cpf_cnpj_blind_index',
+            'users',
+            ['cpf_cnpj_blind_index'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_users_cpf_cnpj_blind_index', 'users', postgresql_concurrently=True)
+        op.drop_index('uq_users_cellphone_blind_index', 'users', postgresql_concurrently=True)
+
+    op.create_unique_constraint('uq_users_cellphone', 'users', ['cellphone'])
+    op.create_unique_constraint('uq_users_cpf_cnpj', 'users', ['cpf_cnpj'])
+    op.drop_column('users', 'cpf_cnpj_blind_index')
+    op.drop_column('users', 'cellphone_blind_index')
@@ -0,0 +1,47 @@
+"""add mare_events table
+
+Revision ID: 8d41f07c2e95
+Revises: 5b2e9c4a1f73
+Create Date: 2026-10-18 11:03:17.540129
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41f07c2e95'
+down_revision: Union[str, None] = '5b2e9c4a1f73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fill it afterwards with `python -m equigest.infra.backfill_mare_events`
+    op.create_table(
+        'mare_events',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('mare_id', sa.Integer(), sa.ForeignKey('mares.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('user_owner', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column(
+            'event_kind',
+            sa.Enum('P4', 'HERPES_VACCINE', 'BIRTH_FORECAST', name='mareeventkind'),
+            nullable=False,
+        ),
+        sa.Column('due_date', sa.Date(), nullable=False),
+    )
+    op.create_index('ix_mare_events_mare_id', 'mare_events', ['mare_id'])
+    op.create_index(
+        'ix_mare_events_user_owner_due_date_event_kind',
+        'mare_events',
+        ['user_owner', 'due_date', 'event_kind'],
+        postgresql_include=['mare_id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('mare_events')
+    sa.Enum(name='mareeventkind').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,43 @@
+"""add processed_billings table
+
+Revision ID: 9e4c1b7d2f68
+Revises: 7a3d9e15c482
+Create Date: 2026-10-18 19:14:48.230761
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4c1b7d2f68'
+down_revision: Union[str, None] = '7a3d9e15c482'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'processed_billings',
+        sa.Column('billing_id', sa.String(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=False),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_abacatepay_client_id',
+            'users',
+            ['abacatepay_client_id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_abacatepay_client_id', 'users', postgresql_concurrently=True)
+
+    op.drop_table('processed_billings')
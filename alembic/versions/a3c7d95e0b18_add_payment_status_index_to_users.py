@@ -0,0 +1,33 @@
+"""add payment status index to users
+
+Revision ID: a3c7d95e0b18
+Revises: 8d41f07c2e95
+Create Date: 2026-10-18 11:48:52.913406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c7d95e0b18'
+down_revision: Union[str, None] = '8d41f07c2e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_payment_status_next_payment_date',
+            'users',
+            ['payment_status', 'next_payment_date'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_payment_status_next_payment_date', 'users', postgresql_concurrently=True)
@@ -0,0 +1,43 @@
+"""add outbox_events table
+
+Revision ID: c61f2ab84d07
+Revises: a3c7d95e0b18
+Create Date: 2026-10-18 12:36:09.771542
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c61f2ab84d07'
+down_revision: Union[str, None] = 'a3c7d95e0b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'outbox_events',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('topic', sa.Enum('ABACATEPAY_CUSTOMER', name='outboxtopic'), nullable=False),
+        sa.Column('aggregate_id', sa.Integer(), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        'ix_outbox_events_pending',
+        'outbox_events',
+        ['topic', 'aggregate_id'],
+        postgresql_where=sa.text('processed_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('outbox_events')
+    sa.Enum(name='outboxtopic').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,36 @@
+"""add pregnancy_counters outbox topic
+
+Revision ID: e4b91d3c5a26
+Revises: c61f2ab84d07
+Create Date: 2026-10-18 14:02:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b91d3c5a26'
+down_revision: Union[str, None] = 'c61f2ab84d07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ALTER TYPE ... ADD VALUE cannot be used inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE outboxtopic ADD VALUE IF NOT EXISTS 'PREGNANCY_COUNTERS'")
+
+
+def downgrade() -> None:
+    # Postgres cannot drop a single enum value: the rows are removed and the
+    # type is recreated without it.
+    op.execute("DELETE FROM outbox_events WHERE topic = 'PREGNANCY_COUNTERS'")
+    op.execute("ALTER TYPE outboxtopic RENAME TO outboxtopic_old")
+    op.execute("CREATE TYPE outboxtopic AS ENUM ('ABACATEPAY_CUSTOMER')")
+    op.execute(
+        "ALTER TABLE outbox_events ALTER COLUMN topic TYPE outboxtopic "
+        "USING topic::text::outboxtopic"
+    )
+    op.execute("DROP TYPE outboxtopic_old")
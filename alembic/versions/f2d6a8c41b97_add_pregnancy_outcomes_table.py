@@ -0,0 +1,88 @@
+"""add pregnancy_outcomes table
+
+Revision ID: f2d6a8c41b97
+Revises: e4b91d3c5a26
+Create Date: 2026-10-18 15:21:07.664913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d6a8c41b97'
+down_revision: Union[str, None] = 'e4b91d3c5a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pregnancy_outcomes',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('mare_id', sa.Integer(), sa.ForeignKey('mares.id'), nullable=False, unique=True),
+        sa.Column('user_owner', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column(
+            'outcome',
+            sa.Enum('FAIL_PREGNANCY', 'SUCCESS_PREGNANCY', name='deletetype'),
+            nullable=False,
+        ),
+        sa.Column(
+            'mare_type',
+            postgresql.ENUM('RECEIVER', 'HEADQUARTERS', name='maretype', create_type=False),
+            nullable=False,
+        ),
+        sa.Column('stallion_name', sa.String(), nullable=False),
+        sa.Column('pregnancy_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('closed_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        'ix_pregnancy_outcomes_user_owner_closed_at',
+        'pregnancy_outcomes',
+        ['user_owner', 'closed_at'],
+    )
+
+    # Outcomes closed before this revision only exist in the Redis counters.
+    # Every existing user gets an uncaptured baseline, which the counter
+    # rebuild fills from Redis so those totals survive it.
+    op.create_table(
+        'pregnancy_counter_baselines',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('successful_pregnancies', sa.Integer(), nullable=True),
+        sa.Column('failed_pregnancies', sa.Integer(), nullable=True),
+    )
+    op.execute('INSERT INTO pregnancy_counter_baselines (user_id) SELECT id FROM users')
+
+    # The partial index is built before the old one is dropped so the names
+    # stay unique throughout.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_mares_user_owner_active_mare_name',
+            'mares',
+            ['user_owner', 'mare_name'],
+            unique=True,
+            postgresql_where=sa.text('active_pregnancy'),
+            postgresql_concurrently=True,
+        )
+        op.drop_index('uq_mares_user_owner_mare_name', 'mares', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fails if a closed pregnancy shares its name with an active one
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_mares_user_owner_mare_name',
+            'mares',
+            ['user_owner', 'mare_name'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index('uq_mares_user_owner_active_mare_name', 'mares', postgresql_concurrently=True)
+
+    op.drop_table('pregnancy_counter_baselines')
+    op.drop_table('pregnancy_outcomes')
+    sa.Enum(name='deletetype').drop(op.get_bind(), checkfirst=True)
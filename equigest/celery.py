@@ -16,6 +16,27 @@ celery_app.conf.update(
     task_serializer='json',
     accept_content=['json'],
     timezone='UTC',
+    # Nothing reads task return values, so skip the result backend writes
+    task_ignore_result=True,
+    # Pool threads only wait on the shared worker event loop, so the
+    # concurrency is how many tasks are in flight at once
+    worker_pool='threads',
+    worker_concurrency=settings.CELERY_WORKER_CONCURRENCY,
+    worker_prefetch_multiplier=settings.CELERY_WORKER_PREFETCH_MULTIPLIER,
+    beat_schedule={
+        'expire-overdue-subscriptions': {
+            'task': 'equigest.tasks.expire_overdue_subscriptions',
+            'schedule': settings.SUBSCRIPTION_SWEEP_INTERVAL_SECONDS,
+        },
+        'relay-pending-customer-provisioning': {
+            'task': 'equigest.tasks.relay_pending_customer_provisioning',
+            'schedule': settings.CUSTOMER_PROVISIONING_RELAY_INTERVAL_SECONDS,
+        },
+        'drain-pregnancy-counters': {
+            'task': 'equigest.tasks.drain_pregnancy_counters',
+            'schedule': settings.COUNTERS_DRAIN_INTERVAL_SECONDS,
+        },
+    },
 )
 
 celery_app.autodiscover_tasks(["equigest"])
\ No newline at end of file
@@ -11,4 +11,21 @@ class PaymentAccessStatus(Enum):
 
 class DeleteType(Enum):
     FAIL_PREGNANCY = "FAIL_PREGNANCY"
-    SUCCESS_PREGNANCY = "SUCCESS_PREGNANCY"
\ No newline at end of file
+    SUCCESS_PREGNANCY = "SUCCESS_PREGNANCY"
+
+class PaginationMode(Enum):
+    OFFSET = "OFFSET"
+    CURSOR = "CURSOR"
+
+class MareEventKind(Enum):
+    P4 = "P4"
+    HERPES_VACCINE = "HERPES_VACCINE"
+    BIRTH_FORECAST = "BIRTH_FORECAST"
+
+class OutboxTopic(Enum):
+    ABACATEPAY_CUSTOMER = "ABACATEPAY_CUSTOMER"
+    PREGNANCY_COUNTERS = "PREGNANCY_COUNTERS"
+
+class ExportFormat(Enum):
+    CSV = "CSV"
+    NDJSON = "NDJSON"
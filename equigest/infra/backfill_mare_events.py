@@ -0,0 +1,42 @@
+import asyncio
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from equigest.infra.database import engine
+
+from equigest.models.mares import Mare
+from equigest.models.mare_events import MareEvent
+from equigest.models.user import User
+
+from equigest.utils.mare import build_mare_events
+
+BATCH_SIZE = 500
+
+async def backfill_mare_events(batch_size: int = BATCH_SIZE):
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        last_id = 0
+        while True:
+            mares = (await session.scalars(
+                select(Mare).where(Mare.id > last_id, Mare.active_pregnancy).order_by(Mare.id).limit(batch_size)
+            )).all()
+            if not mares:
+                break
+
+            mare_ids = [mare.id for mare in mares]
+            await session.execute(
+                delete(MareEvent).where(MareEvent.mare_id.in_(mare_ids))
+            )
+            session.add_all([
+                event for mare in mares for event in build_mare_events(mare)
+            ])
+            await session.commit()
+
+            last_id = mare_ids[-1]
+            print(f'Backfilled events up to mare {last_id}')
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_mare_events())
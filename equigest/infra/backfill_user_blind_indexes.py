@@ -0,0 +1,66 @@
+import asyncio
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from equigest.infra.database import engine
+
+from equigest.models.user import User
+
+from equigest.utils.security.cryptographer import uncrypt_data, blind_index
+
+BATCH_SIZE = 500
+
+async def _set_blind_indexes(session: AsyncSession, values: list[dict]):
+    await session.execute(
+        update(User),
+        values
+    )
+
+async def backfill_user_blind_indexes(batch_size: int = BATCH_SIZE):
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        last_id = 0
+        while True:
+            users = (await session.execute(
+                select(User.id, User.cellphone, User.cpf_cnpj)
+                .where(User.id > last_id)
+                .order_by(User.id)
+                .limit(batch_size)
+            )).all()
+            if not users:
+                break
+
+            values = [
+                {
+                    'id': user.id,
+                    'cellphone_blind_index': blind_index(uncrypt_data(user.cellphone)),
+                    'cpf_cnpj_blind_index': blind_index(uncrypt_data(user.cpf_cnpj)),
+                }
+                for user in users
+            ]
+
+            try:
+                await _set_blind_indexes(session, values)
+                await session.commit()
+            except IntegrityError:
+                # Some users registered the same cellphone or CPF/CNPJ before
+                # the check worked. The batch is retried one user at a time
+                # and the repeated ones are left without an index.
+                await session.rollback()
+                for value in values:
+                    try:
+                        await _set_blind_indexes(session, [value])
+                        await session.commit()
+                    except IntegrityError:
+                        await session.rollback()
+                        print(f'User {value["id"]} repeats the cellphone or CPF/CNPJ of another user')
+
+            last_id = users[-1].id
+            print(f'Backfilled blind indexes up to user {last_id}')
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_user_blind_indexes())
@@ -5,7 +5,11 @@ from equigest.infra.database import mapper_registry, engine
 async def create_models():
     async with engine.begin() as conn:
         from equigest.models.mares import Mare
+        from equigest.models.mare_events import MareEvent
         from equigest.models.user import User
+        from equigest.models.outbox import OutboxEvent
+        from equigest.models.pregnancy_outcomes import PregnancyOutcome, PregnancyCounterBaseline
+        from equigest.models.processed_billings import ProcessedBilling
         await conn.run_sync(mapper_registry.metadata.create_all)
 
     await engine.dispose()
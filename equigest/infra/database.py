@@ -7,6 +7,11 @@ settings = Settings()
 DATABASE_URL = settings.POSTGRES_URL
 
 engine = create_async_engine(
-    DATABASE_URL
+    DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=True
 )
 mapper_registry = registry()
\ No newline at end of file
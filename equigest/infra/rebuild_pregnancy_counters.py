@@ -0,0 +1,18 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from equigest.infra.database import engine
+
+from equigest.services.counters import PregnancyCounterService
+
+async def rebuild_pregnancy_counters():
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        rebuilt_count = await PregnancyCounterService(session).rebuild_all()
+        print(f'Rebuilt pregnancy counters for {rebuilt_count} users')
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_pregnancy_counters())
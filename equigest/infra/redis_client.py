@@ -6,10 +6,14 @@ class AsyncRedisClient:
     def __init__(self, url: str):
         self._client = redis.from_url(url)
 
-    async def hincryby_fields(self, key: str, **fields: int):
+    async def hincrby_many(self, increments: dict[str, dict[str, int]]):
+        # One MULTI/EXEC round-trip: every field moves together or none does
         try:
-            for field, value in fields.items():
-                await self._client.hincrby(key, field, value)
+            async with self._client.pipeline(transaction=True) as pipe:
+                for key, fields in increments.items():
+                    for field, value in fields.items():
+                        pipe.hincrby(key, field, value)
+                await pipe.execute()
         except redis.RedisError as e:
             raise e
 
@@ -21,6 +25,26 @@ class AsyncRedisClient:
         except redis.RedisError as e:
             raise e
         
+    async def hget_all_many(self, keys: list[str]) -> list[dict]:
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.hgetall(key)
+                results = await pipe.execute()
+
+            return [{k.decode(): int(v) for k, v in result.items()} for result in results]
+        except redis.RedisError as e:
+            raise e
+
+    async def hset_many(self, mappings: dict[str, dict[str, int]]):
+        try:
+            async with self._client.pipeline(transaction=True) as pipe:
+                for key, mapping in mappings.items():
+                    pipe.hset(key, mapping=mapping)
+                await pipe.execute()
+        except redis.RedisError as e:
+            raise e
+
     async def hset_initial(self, key: str, mapping: dict):
         try:
             safe_mapping = {}
@@ -32,6 +56,59 @@ class AsyncRedisClient:
         except (redis.RedisError, ValueError) as e:
             raise e
 
+    async def get(self, key: str):
+        try:
+            return await self._client.get(key)
+        except redis.RedisError as e:
+            raise e
+
+    async def set(self, key: str, value: str, ex: int = None, nx: bool = False) -> bool:
+        # With nx the key is only written if missing; False means it existed
+        try:
+            return bool(await self._client.set(key, value, ex=ex, nx=nx))
+        except redis.RedisError as e:
+            raise e
+
+    async def get_or_init(self, key: str, initial: int):
+        try:
+            async with self._client.pipeline(transaction=True) as pipe:
+                pipe.set(key, initial, nx=True)
+                pipe.get(key)
+                _, value = await pipe.execute()
+
+            return value
+        except redis.RedisError as e:
+            raise e
+
+    async def incr(self, key: str, initial: int = 0) -> int:
+        # A missing key starts from `initial` instead of 0
+        try:
+            async with self._client.pipeline(transaction=True) as pipe:
+                pipe.set(key, initial, nx=True)
+                pipe.incr(key)
+                _, value = await pipe.execute()
+
+            return value
+        except redis.RedisError as e:
+            raise e
+
+    async def delete(self, *keys: str):
+        try:
+            if keys:
+                await self._client.delete(*keys)
+        except redis.RedisError as e:
+            raise e
+
+    async def ping(self):
+        # Opens a pooled connection ahead of the first request
+        try:
+            await self._client.ping()
+        except redis.RedisError as e:
+            raise e
+
+    async def close(self):
+        await self._client.aclose()
+
 settings = Settings()
 redis_url = settings.DEFINITIVE_REDIS_URL
 
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import logging
+import time
+
+from functools import lru_cache
+
+from typing import Any, Awaitable, Callable, Optional
+
+import redis.asyncio as redis
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+
+from pydantic import TypeAdapter
+
+from equigest.settings import Settings
+
+from equigest.infra.redis_client import AsyncRedisClient, async_redis_client
+
+logger = logging.getLogger(__name__)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+
+    # If-None-Match uses the weak comparison, so a W/ prefix is ignored
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+@lru_cache
+def _type_adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+class ResponseCache:
+    """
+    Redis cache of serialized read responses, scoped to a per-user data version.
+
+    Writes bump the version instead of deleting entries: every cached response
+    of the user stops matching at once and the stale ones expire with the TTL.
+    The version also makes the ETag, so a matching If-None-Match is answered
+    with 304 before any lookup. When Redis is unavailable the responses are
+    simply built uncached and without ETag.
+    """
+    def __init__(self, redis_client: AsyncRedisClient, ttl: int):
+        self._redis = redis_client
+        self._ttl = ttl
+
+    def _version_key(self, user_id: int) -> str:
+        return f"user:{user_id}:data-version"
+
+    def _params_hash(self, user_id: int, endpoint: str, params: dict) -> str:
+        normalized_params = json.dumps(
+            [user_id, endpoint, jsonable_encoder(params)],
+            sort_keys=True
+        )
+
+        return hashlib.sha256(normalized_params.encode()).hexdigest()[:32]
+
+    async def get_data_version(self, user_id: int) -> Optional[int]:
+        # A missing version (new user, or the key was evicted) starts from the
+        # current time so it never repeats a version an old ETag was built on.
+        try:
+            version = await self._redis.get_or_init(
+                self._version_key(user_id),
+                time.time_ns() // 1000
+            )
+        except redis.RedisError:
+            return None
+
+        return int(version)
+
+    async def bump_data_version(self, user_id: int):
+        try:
+            await self._redis.incr(self._version_key(user_id), time.time_ns() // 1000)
+        except redis.RedisError:
+            # The write is already committed; stale entries expire with the TTL
+            logger.exception('Failed to bump data version of user %s', user_id)
+
+    async def get_or_set(
+        self,
+        request: Request,
+        user_id: int,
+        params: dict,
+        load: Callable[[], Awaitable[Any]],
+        response_model: Any = None
+    ) -> Response:
+        version = await self.get_data_version(user_id)
+        if version is None:
+            return self._to_response(await load(), response_model)
+
+        params_hash = self._params_hash(user_id, request.url.path, params)
+        headers = {
+            'ETag': f'"{version}-{params_hash[:16]}"',
+            'Cache-Control': 'private, no-cache',
+        }
+        if etag_matches(request.headers.get('If-None-Match'), headers['ETag']):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        key = f"response:{user_id}:{version}:{params_hash}"
+        try:
+            cached = await self._redis.get(key)
+        except redis.RedisError:
+            cached = None
+        if cached is not None:
+            return Response(content=cached, media_type='application/json', headers=headers)
+
+        response = self._to_response(await load(), response_model)
+        response.headers.update(headers)
+        try:
+            await self._redis.set(key, response.body, ex=self._ttl)
+        except redis.RedisError:
+            pass
+
+        return response
+
+    def _to_response(self, result: Any, response_model: Any) -> Response:
+        if response_model is None:
+            content = json.dumps(jsonable_encoder(result)).encode()
+        else:
+            adapter = _type_adapter(response_model)
+            content = adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+
+        return Response(content=content, media_type='application/json')
+
+settings = Settings()
+
+response_cache = ResponseCache(
+    async_redis_client,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
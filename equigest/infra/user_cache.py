@@ -0,0 +1,115 @@
+import logging
+import time
+
+from collections import OrderedDict
+from typing import Optional
+
+import redis.asyncio as redis
+
+from equigest.settings import Settings
+
+from equigest.models.user import User
+from equigest.schemas.user import CachedUserSchema
+
+from equigest.infra.redis_client import AsyncRedisClient, async_redis_client
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str):
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str):
+        self._entries.pop(key, None)
+
+class UserCache:
+    """
+    Two-tier cache of authenticated users keyed by token subject.
+
+    Invalidation only reaches the Redis tier and the local tier of the calling
+    process, so other processes may serve a user up to the local TTL old. Cached
+    users are detached snapshots without the password hash.
+    """
+    def __init__(self, redis_client: AsyncRedisClient, local_ttl: int, local_maxsize: int, redis_ttl: int):
+        self._redis = redis_client
+        self._local = TTLCache(local_maxsize, local_ttl)
+        self._redis_ttl = redis_ttl
+
+    def _key(self, username: str) -> str:
+        return f"auth:user:{username}"
+
+    async def get(self, username: str) -> Optional[User]:
+        key = self._key(username)
+
+        payload = self._local.get(key)
+        if payload is None:
+            try:
+                payload = await self._redis.get(key)
+            except redis.RedisError:
+                return None
+            if payload is None:
+                return None
+            self._local.set(key, payload)
+
+        return self._to_user(CachedUserSchema.model_validate_json(payload))
+
+    async def set(self, user: User):
+        key = self._key(user.username)
+        payload = CachedUserSchema.model_validate(user).model_dump_json()
+
+        self._local.set(key, payload)
+        try:
+            await self._redis.set(key, payload, ex=self._redis_ttl)
+        except redis.RedisError:
+            pass
+
+    async def invalidate(self, *usernames: str):
+        keys = [self._key(username) for username in usernames]
+        for key in keys:
+            self._local.pop(key)
+
+        # Callers invalidate after committing, so a Redis outage must not fail
+        # them; the stale entry expires with the Redis TTL.
+        try:
+            await self._redis.delete(*keys)
+        except redis.RedisError:
+            logger.warning('Failed to invalidate cached users %s', usernames, exc_info=True)
+
+    def _to_user(self, cached: CachedUserSchema) -> User:
+        fields = cached.model_dump(exclude={'id', 'created_at'})
+        user = User(password='', **fields)
+        user.id = cached.id
+        user.created_at = cached.created_at
+
+        return user
+
+settings = Settings()
+
+user_cache = UserCache(
+    async_redis_client,
+    local_ttl=settings.USER_CACHE_LOCAL_TTL_SECONDS,
+    local_maxsize=settings.USER_CACHE_LOCAL_MAXSIZE,
+    redis_ttl=settings.USER_CACHE_REDIS_TTL_SECONDS,
+)
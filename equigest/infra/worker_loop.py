@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+from typing import Any, Coroutine, Optional
+
+from equigest.infra.database import engine
+
+class WorkerLoop:
+    """
+    One event loop per worker process, running in a background thread.
+
+    Celery pool threads hand their coroutines to it, so tasks run
+    concurrently and the engine pool, Redis and HTTP connections (all bound
+    to the loop that opened them) are reused across tasks.
+    """
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name='equigest-worker-loop',
+                    daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def run(self, coroutine: Coroutine) -> Any:
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+        return future.result()
+
+    def shutdown(self):
+        with self._lock:
+            loop = self._loop
+            if loop is None or loop.is_closed():
+                return
+
+            asyncio.run_coroutine_threadsafe(engine.dispose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join()
+            loop.close()
+
+worker_loop = WorkerLoop()
@@ -0,0 +1,128 @@
+import asyncio
+import random
+import time
+
+from typing import Optional
+
+import httpx
+
+from equigest.settings import Settings
+
+from equigest.integrations.abacatepay.exceptions import AbacatePayUnavailable
+
+settings = Settings()
+
+# Errors raised before the request reaches AbacatePay, safe to retry even for
+# non-idempotent calls like billing creation.
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+RETRYABLE_STATUS_CODES = {429, 503}
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+
+    def allow_request(self) -> bool:
+        if self._opened_at is None:
+            return True
+
+        # Half-open: let calls through again once the cool-down has passed,
+        # a new failure re-opens the circuit immediately.
+        return time.monotonic() - self._opened_at >= self.reset_timeout
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self):
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+class AbacatePayClient:
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        timeout: httpx.Timeout,
+        limits: httpx.Limits,
+        max_retries: int,
+        circuit_breaker: CircuitBreaker
+    ):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.limits = limits
+        self.max_retries = max_retries
+        self.circuit_breaker = circuit_breaker
+        self._http: Optional[httpx.AsyncClient] = None
+
+    async def open(self):
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                timeout=self.timeout,
+                limits=self.limits,
+            )
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def post(self, path: str, payload: dict) -> httpx.Response:
+        if not self.circuit_breaker.allow_request():
+            raise AbacatePayUnavailable('AbacatePay circuit is open')
+
+        await self.open()
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Exponential backoff with full jitter
+                await asyncio.sleep(random.uniform(0, 0.2 * 2 ** attempt))
+
+            try:
+                response = await self._http.post(path, json=payload)
+            except RETRYABLE_ERRORS as e:
+                last_error = e
+                continue
+            except httpx.HTTPError as e:
+                self.circuit_breaker.record_failure()
+                raise AbacatePayUnavailable(str(e)) from e
+
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                continue
+
+            if response.status_code >= 500:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+
+            return response
+
+        self.circuit_breaker.record_failure()
+        raise AbacatePayUnavailable(str(last_error)) from last_error
+
+abacatepay_client = AbacatePayClient(
+    base_url=settings.ABACATEPAY_BASE_URL,
+    api_key=settings.ABACATEPAY_KEY,
+    timeout=httpx.Timeout(
+        settings.ABACATEPAY_TIMEOUT_SECONDS,
+        connect=settings.ABACATEPAY_CONNECT_TIMEOUT_SECONDS
+    ),
+    limits=httpx.Limits(
+        max_connections=settings.ABACATEPAY_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.ABACATEPAY_MAX_CONNECTIONS
+    ),
+    max_retries=settings.ABACATEPAY_MAX_RETRIES,
+    circuit_breaker=CircuitBreaker(
+        failure_threshold=settings.ABACATEPAY_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.ABACATEPAY_CIRCUIT_RESET_SECONDS
+    ),
+)
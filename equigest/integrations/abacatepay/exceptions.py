@@ -0,0 +1,2 @@
+class AbacatePayUnavailable(Exception):
+    "Raised when AbacatePay can't be reached or the circuit breaker is open"
@@ -0,0 +1,71 @@
+"""
+Local stand-in for the AbacatePay API, for development and integration tests.
+
+    uvicorn equigest.integrations.abacatepay.fake_server:app --port 8081
+
+and set ABACATEPAY_BASE_URL=http://localhost:8081/v1. Latency and failures can
+be injected at runtime with POST /_fake/config.
+"""
+import asyncio
+import random
+import uuid
+
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException, Request, status
+from pydantic import BaseModel
+
+class FakeConfigSchema(BaseModel):
+    latency_seconds: float = 0.0
+    failure_rate: float = 0.0
+    failure_status_code: int = 503
+
+app = FastAPI(title='Fake AbacatePay')
+app.state.config = FakeConfigSchema()
+app.state.customers = {}
+app.state.billings = {}
+
+async def simulate_conditions(authorization: Optional[str]):
+    config: FakeConfigSchema = app.state.config
+
+    if not authorization or not authorization.startswith('Bearer '):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Missing API key')
+
+    if config.latency_seconds:
+        await asyncio.sleep(config.latency_seconds)
+
+    if random.random() < config.failure_rate:
+        raise HTTPException(status_code=config.failure_status_code, detail='Simulated failure')
+
+@app.post('/_fake/config')
+async def configure(config: FakeConfigSchema):
+    app.state.config = config
+    return config
+
+@app.post('/v1/customer/create')
+async def create_customer(request: Request, authorization: Optional[str] = Header(None)):
+    await simulate_conditions(authorization)
+    payload = await request.json()
+
+    customer_id = f'cust_{uuid.uuid4().hex[:16]}'
+    app.state.customers[customer_id] = payload
+
+    return {'data': {'id': customer_id, 'metadata': payload}, 'error': None}
+
+@app.post('/v1/billing/create')
+async def create_billing(request: Request, authorization: Optional[str] = Header(None)):
+    await simulate_conditions(authorization)
+    payload = await request.json()
+
+    billing_id = f'bill_{uuid.uuid4().hex[:16]}'
+    app.state.billings[billing_id] = payload
+
+    return {
+        'data': {
+            'id': billing_id,
+            'url': f'{request.base_url}pay/{billing_id}',
+            'status': 'PENDING',
+            'customer': {'id': payload.get('customerId'), 'metadata': payload.get('customer')},
+        },
+        'error': None,
+    }
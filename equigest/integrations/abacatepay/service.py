@@ -1,5 +1,3 @@
-import requests
-
 from fastapi import HTTPException, status
 
 from equigest.settings import Settings
@@ -7,22 +5,24 @@ from equigest.settings import Settings
 from equigest.models.user import User
 
 from equigest.integrations.abacatepay.schemas.create_customer import CreateCustomerSchema
+from equigest.integrations.abacatepay.client import AbacatePayClient, abacatepay_client
+from equigest.integrations.abacatepay.exceptions import AbacatePayUnavailable
 
 from equigest.utils.security.cryptographer import uncrypt_fields
 
 settings = Settings()
-ABACATEPAY_KEY = settings.ABACATEPAY_KEY
 
 RETURN_URL = settings.RETURN_URL
 COMPLET_URL = settings.COMPLET_URL
 
 class AbacatePayIntegrationService:
-    def __init__(self):
-        self.create_billing_url = 'https://api.abacatepay.com/v1/billing/create'
-        self.create_customer_url = 'https://api.abacatepay.com/v1/customer/create'
+    def __init__(self, client: AbacatePayClient = abacatepay_client):
+        self.client = client
+        self.create_billing_url = '/billing/create'
+        self.create_customer_url = '/customer/create'
         self.sensive_fields = ['cellphone', 'cpf_cnpj']
 
-    def create_customer(
+    async def create_customer(
         self,
         customer: CreateCustomerSchema
     ) -> dict:
@@ -32,24 +32,34 @@ class AbacatePayIntegrationService:
         "email": f"{customer.email}",
         "taxId": f"{customer.tax_id}"
         }
-        headers = {
-            "Authorization": f"Bearer {ABACATEPAY_KEY}",
-            "Content-Type": "application/json"
-        }
 
-        response = requests.request("POST", self.create_customer_url, json=payload, headers=headers)
+        try:
+            response = await self.client.post(self.create_customer_url, payload)
+        except AbacatePayUnavailable as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f'Error in customer create. {e}'
+            )
+
         if response.status_code == 200:
             data = response.json()
             return {
                 'customer_id': data['data'].get('id')
             }
-        else:
+        elif response.status_code >= 500 or response.status_code == 429:
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,
                 detail=f'Error in customer create. {response.text}'
             )
+        else:
+            # Rejected customer data (e.g. an invalid tax id) fails the same
+            # way on every retry
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f'Customer rejected by AbacatePay. {response.text}'
+            )
 
-    def create_billing(
+    async def create_billing(
         self,
         user: User
     ) -> dict:
@@ -77,12 +87,14 @@ class AbacatePayIntegrationService:
                 "taxId": f"{user.cpf_cnpj}"
             }
         }
-        headers = {
-            "Authorization": f"Bearer {ABACATEPAY_KEY}",
-            "Content-Type": "application/json"
-        }
 
-        response = requests.request("POST", self.create_billing_url, json=payload, headers=headers)
+        try:
+            response = await self.client.post(self.create_billing_url, payload)
+        except AbacatePayUnavailable as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f'Error in billing create. {e}'
+            )
 
         if response.status_code == 200:
             data = response.json()
@@ -96,4 +108,4 @@ class AbacatePayIntegrationService:
             )
 
 def get_abacatepay_integration_service() -> AbacatePayIntegrationService:
-    return AbacatePayIntegrationService()
\ No newline at end of file
+    return AbacatePayIntegrationService()
@@ -0,0 +1,28 @@
+from datetime import date
+
+from sqlalchemy import Date, Enum, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from equigest.infra.database import mapper_registry
+from equigest.enums.enums import MareEventKind
+
+@mapper_registry.mapped_as_dataclass
+class MareEvent:
+    __tablename__ = 'mare_events'
+    __table_args__ = (
+        Index(
+            'ix_mare_events_user_owner_due_date_event_kind',
+            'user_owner', 'due_date', 'event_kind',
+            postgresql_include=['mare_id']
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    mare_id: Mapped[int] = mapped_column(
+        ForeignKey('mares.id', ondelete='CASCADE'), index=True
+    )
+    user_owner: Mapped[int] = mapped_column(
+        ForeignKey('users.id')
+    )
+    event_kind: Mapped[MareEventKind] = mapped_column(Enum(MareEventKind))
+    due_date: Mapped[date] = mapped_column(Date)
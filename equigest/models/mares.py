@@ -2,15 +2,35 @@ from typing import Optional
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, func, Enum, ForeignKey
+from sqlalchemy import DateTime, func, Enum, ForeignKey, Index, literal_column, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from equigest.infra.database import mapper_registry
 from equigest.enums.enums import MareType
 
+BIRTH_FORECAST_DAYS = 335
+
 @mapper_registry.mapped_as_dataclass
 class Mare:
     __tablename__ = 'mares'
+    __table_args__ = (
+        Index('ix_mares_user_owner_mare_type', 'user_owner', 'mare_type', 'mare_name', 'id'),
+        # Closed pregnancies keep their row, so a name is only unique among
+        # the active ones.
+        Index(
+            'uq_mares_user_owner_active_mare_name',
+            'user_owner', 'mare_name',
+            unique=True,
+            postgresql_where=text('active_pregnancy')
+        ),
+        Index('ix_mares_user_owner_pregnancy_date', 'user_owner', 'pregnancy_date', 'id'),
+        Index('ix_mares_user_owner_updated_at', 'user_owner', 'updated_at', 'id'),
+        Index(
+            'ix_mares_user_owner_birth_forecast',
+            'user_owner',
+            text(f"(timezone('UTC', pregnancy_date) + interval '{BIRTH_FORECAST_DAYS} days')")
+        ),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     mare_name: Mapped[str]
@@ -27,3 +47,17 @@ class Mare:
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), init=False, default=func.now()
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        init=False,
+        default=func.now(),
+        onupdate=func.now(),
+        server_default=func.now()
+    )
+
+# Must render exactly like the ix_mares_user_owner_birth_forecast expression
+# (inline constants, no bind parameters) for the planner to match the index.
+birth_forecast_date = (
+    func.timezone(literal_column("'UTC'"), Mare.pregnancy_date)
+    + literal_column(f"interval '{BIRTH_FORECAST_DAYS} days'")
+)
@@ -0,0 +1,40 @@
+from typing import Optional
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, func, Enum, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from equigest.infra.database import mapper_registry
+from equigest.enums.enums import OutboxTopic
+
+@mapper_registry.mapped_as_dataclass
+class OutboxEvent:
+    __tablename__ = 'outbox_events'
+    __table_args__ = (
+        Index(
+            'ix_outbox_events_pending',
+            'topic', 'aggregate_id',
+            postgresql_where=text('processed_at IS NULL')
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    topic: Mapped[OutboxTopic] = mapped_column(Enum(OutboxTopic))
+    aggregate_id: Mapped[int]
+    payload: Mapped[dict] = mapped_column(JSONB, default_factory=dict)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), init=False, default=func.now()
+    )
+    processed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), init=False, default=None
+    )
+    # Used by single-row topics claimed around an external call
+    attempts: Mapped[int] = mapped_column(init=False, default=0, server_default='0')
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), init=False, default=None
+    )
+    failed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), init=False, default=None
+    )
@@ -0,0 +1,50 @@
+from typing import Optional
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, func, Enum, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from equigest.infra.database import mapper_registry
+from equigest.enums.enums import MareType, DeleteType
+
+@mapper_registry.mapped_as_dataclass
+class PregnancyOutcome:
+    __tablename__ = 'pregnancy_outcomes'
+    __table_args__ = (
+        Index('ix_pregnancy_outcomes_user_owner_closed_at', 'user_owner', 'closed_at'),
+    )
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    mare_id: Mapped[int] = mapped_column(
+        ForeignKey('mares.id'), unique=True
+    )
+    user_owner: Mapped[int] = mapped_column(
+        ForeignKey('users.id')
+    )
+    outcome: Mapped[DeleteType] = mapped_column(Enum(DeleteType))
+    # Copied from the mare so the aggregates never need to join mares
+    mare_type: Mapped[MareType] = mapped_column(Enum(MareType))
+    stallion_name: Mapped[str]
+    pregnancy_date: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True)
+    )
+    closed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), init=False, default=func.now()
+    )
+
+@mapper_registry.mapped_as_dataclass
+class PregnancyCounterBaseline:
+    """
+    Outcomes closed before pregnancy_outcomes existed, per user.
+
+    NULL totals have not been captured from Redis yet; the counter rebuild
+    fills them in once and adds them to the recorded outcomes from then on.
+    """
+    __tablename__ = 'pregnancy_counter_baselines'
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id'), primary_key=True
+    )
+    successful_pregnancies: Mapped[Optional[int]] = mapped_column(default=None)
+    failed_pregnancies: Mapped[Optional[int]] = mapped_column(default=None)
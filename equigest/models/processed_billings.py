@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, func, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from equigest.infra.database import mapper_registry
+
+@mapper_registry.mapped_as_dataclass
+class ProcessedBilling:
+    __tablename__ = 'processed_billings'
+
+    billing_id: Mapped[str] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id')
+    )
+    processed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), init=False, default=func.now()
+    )
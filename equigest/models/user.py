@@ -2,7 +2,7 @@ from typing import Optional
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, func, Enum
+from sqlalchemy import DateTime, func, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from equigest.infra.database import mapper_registry
@@ -12,6 +12,12 @@ from equigest.enums.enums import PaymentAccessStatus
 @mapper_registry.mapped_as_dataclass
 class User:
     __tablename__ = 'users'
+    __table_args__ = (
+        Index('ix_users_payment_status_next_payment_date', 'payment_status', 'next_payment_date'),
+        Index('uq_users_cellphone_blind_index', 'cellphone_blind_index', unique=True),
+        Index('uq_users_cpf_cnpj_blind_index', 'cpf_cnpj_blind_index', unique=True),
+        Index('ix_users_abacatepay_client_id', 'abacatepay_client_id'),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     username: Mapped[str] = mapped_column(unique=True)
@@ -26,6 +32,9 @@ class User:
     payment_status: Mapped[PaymentAccessStatus] = mapped_column(
         Enum(PaymentAccessStatus), default=PaymentAccessStatus.TRIAL
     )
+    # HMAC of the plain values; cellphone and cpf_cnpj are only stored encrypted
+    cellphone_blind_index: Mapped[Optional[str]] = mapped_column(default=None)
+    cpf_cnpj_blind_index: Mapped[Optional[str]] = mapped_column(default=None)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), init=False, default=func.now()
     )
\ No newline at end of file
@@ -1,33 +1,38 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 
 from equigest.schemas.user import UserCreateSchema
 from equigest.schemas.token_schema import TokenSchema
 
-from equigest.integrations.abacatepay.schemas.create_customer import CreateCustomerSchema
+from kombu.exceptions import OperationalError
 
 from equigest.services.user import (
     UserService,
 )
 
-from equigest.integrations.abacatepay.service import (
-    AbacatePayIntegrationService,
-    get_abacatepay_integration_service
-)
-
 from equigest.infra.redis_client import async_redis_client
 
-from equigest.services.exceptions import UserAlreadyExists
+from equigest.services.exceptions import UserAlreadyExists, PasswordHashingBusy
 
 from equigest.utils.security.oauth_token import create_access_token
-from equigest.utils.security.hasher import check_password
+from equigest.utils.security.hasher import verify_and_update_password
+
+from equigest.tasks import provision_abacatepay_customer
 
 from equigest.setup import limiter
 
 auth_router = APIRouter()
 
+def password_hashing_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail='Too many login or register attempts are being processed. Try again shortly.',
+        headers={'Retry-After': '1'},
+    )
+
 @auth_router.post(
     '/register',
     status_code=status.HTTP_201_CREATED,
@@ -49,11 +54,11 @@ auth_router = APIRouter()
                 }
             },
         },
-        status.HTTP_502_BAD_GATEWAY : {
-            'description': "Error in customer create.",
+        status.HTTP_503_SERVICE_UNAVAILABLE : {
+            'description': "Too many login or register attempts are being processed. Try again shortly.",
             'content': {
                 'application/json': {
-                    'example': {'detail': "Error in customer create"}
+                    'example': {'detail': "Too many login or register attempts are being processed. Try again shortly."}
                 }
             },
         },
@@ -64,10 +69,9 @@ async def register(
     request: Request,
     user: UserCreateSchema,
     user_service: Annotated[UserService, Depends()],
-    abacatepay_service: Annotated[AbacatePayIntegrationService, Depends(get_abacatepay_integration_service)],
 ):
     """
-    Create a user in the internal database and as a system client in AbacatePay
+    Create a user in the internal database. The AbacatePay customer is created in background
 
     - **username**: Name of the user account to be created
     - **password**: Password of the user account that will by hashed and added to user
@@ -77,17 +81,6 @@ async def register(
 
     """
     try:
-        customer_id = abacatepay_service.create_customer(
-            CreateCustomerSchema(
-                name=user.username,
-                email=user.email,
-                cellphone=user.cellphone,
-                tax_id=user.cpf_cnpj
-            )
-        )
-
-        user.abacatepay_client_id = customer_id['customer_id']
-
         user = await user_service.create_user(user)
 
         await async_redis_client.hset_initial(f"user:{user.id}", {
@@ -101,6 +94,15 @@ async def register(
             status_code=status.HTTP_409_CONFLICT,
             detail='User already exists',
         )
+    except PasswordHashingBusy:
+        raise password_hashing_busy_exception()
+
+    # Publishing to the broker is blocking I/O, kept off the event loop
+    try:
+        await run_in_threadpool(provision_abacatepay_customer.delay, user.id)
+    except (OperationalError, OSError):
+        # The outbox row is picked up by relay_pending_customer_provisioning
+        pass
     
     access_token = create_access_token(data={'sub': user.username})
 
@@ -127,6 +129,14 @@ async def register(
                 }
             },
         },
+        status.HTTP_503_SERVICE_UNAVAILABLE : {
+            'description': "Too many login or register attempts are being processed. Try again shortly.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "Too many login or register attempts are being processed. Try again shortly."}
+                }
+            },
+        },
     },
 )
 @limiter.limit("10/minute")
@@ -145,12 +155,26 @@ async def login(
     """
     user = await user_service.get_user(login_data.username)
 
-    if not user or not check_password(login_data.password, user.password):
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Incorrect username or password',
         )
 
+    try:
+        is_valid, new_password_hash = await verify_and_update_password(login_data.password, user.password)
+    except PasswordHashingBusy:
+        raise password_hashing_busy_exception()
+
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Incorrect username or password',
+        )
+
+    if new_password_hash:
+        await user_service.update_password_hash(user, new_password_hash)
+
     access_token = create_access_token(data={'sub': user.username})
 
     return {'access_token': access_token, 'token_type': 'bearer'}
\ No newline at end of file
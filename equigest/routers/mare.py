@@ -1,38 +1,86 @@
-from typing import Annotated
+import hashlib
+import json
 
-from datetime import timedelta
+from typing import Annotated, Optional, Union
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, status, Request
+from fastapi import APIRouter, Depends, status, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from fastapi_pagination import Page, Params
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from equigest.schemas.mare import MareCreateOrEditSchema, MareSchema, DeleteMareSchema
-from equigest.schemas.query import MareQueryParams, MareQueryByBirthForecastParams
+from fastapi_pagination import Page
+
+from equigest.schemas.mare import (
+    MareCreateOrEditSchema,
+    MareSchema,
+    DeleteMareSchema,
+    GraphicCountersSchema,
+    MareChangesPage,
+    MareImportResultSchema
+)
+from equigest.schemas.query import (
+    MareQueryParams,
+    MareQueryByBirthForecastParams,
+    MareChangesQueryParams,
+    MareExportQueryParams
+)
+from equigest.schemas.pagination import CursorPage
 
 from equigest.models.user import User
 
 from equigest.services.mare import (
     MareService,
 )
+from equigest.services.counters import PregnancyCounterService
 
+from kombu.exceptions import OperationalError
+
+from equigest.infra.database import engine
 from equigest.infra.redis_client import async_redis_client
+from equigest.infra.response_cache import response_cache, etag_matches
 
-from equigest.utils.mare import get_managment_schedule, is_in_p4_range, is_in_herpes_range, update_success_or_fail_counters
+from equigest.utils.mare import get_managment_schedule
+from equigest.utils.mare_import import get_import_media_type, read_import_lines, parse_mare_import
+from equigest.utils.mare_export import EXPORT_MEDIA_TYPES, export_mares
 from equigest.utils.user import validate_paid_user
 
 from equigest.enums.enums import MareType
 
 from equigest.setup import limiter
 
+from equigest.settings import Settings
+
+from equigest.tasks import drain_pregnancy_counters
+
 mare_router = APIRouter(
     prefix="/mares"
 )
 
+MarePage = Union[Page[MareSchema], CursorPage[MareSchema]]
+
+MANAGMENT_SCHEDULE_MAX_AGE_SECONDS = 86400
+
+settings = Settings()
+
+async def enqueue_counters_drain():
+    # Publishing to the broker is blocking I/O, kept off the event loop
+    try:
+        await run_in_threadpool(drain_pregnancy_counters.delay)
+    except (OperationalError, OSError):
+        # The outbox rows stay pending until the periodic drain runs
+        pass
+
 @mare_router.get(
     '/',
     status_code=status.HTTP_200_OK,
-    response_model=Page[MareSchema],
+    response_model=MarePage,
     responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            'description': "The If-None-Match ETag still matches; the body is empty.",
+        },
         status.HTTP_429_TOO_MANY_REQUESTS : {
             'description': "You are sending too many requests..",
             'content': {
@@ -57,17 +105,77 @@ async def get_mares(
     query: Annotated[MareQueryByBirthForecastParams, Depends()],
     mare_service: Annotated[MareService, Depends()],
     current_user: Annotated[User, Depends(validate_paid_user)]
-) -> Page[MareSchema]:
+):
     """
     List all mares from their type
 
     - **mare_type**: Type of Mare (RECEIVER or HEADQUARTERS)
     - **page**: The page that you want see
     - **size**: The number of items per page
+    - **include_total**: OPTIONAL Set to false to skip counting the total of items
+    - **pagination_mode**: OPTIONAL OFFSET (default) or CURSOR for keyset pagination
+    - **cursor**: OPTIONAL The next_cursor of the previous page, in CURSOR mode
     
     """
-    params = Params(page=query.page, size=query.size)
-    return await mare_service.get_mares(current_user.id, query.mare_type, params)
+    params = query.pagination_params()
+    return await response_cache.get_or_set(
+        request,
+        current_user.id,
+        query.model_dump(),
+        lambda: mare_service.get_mares(current_user.id, query.mare_type, params, query.include_total),
+        MarePage
+    )
+
+@mare_router.get(
+    '/changes',
+    status_code=status.HTTP_200_OK,
+    response_model=MareChangesPage,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {
+            'description': "The since cursor is not valid.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "Invalid pagination cursor"}
+                }
+            },
+        },
+        status.HTTP_429_TOO_MANY_REQUESTS : {
+            'description': "You are sending too many requests.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "You are sending too many requests."}
+                }
+            },
+        },
+        status.HTTP_402_PAYMENT_REQUIRED : {
+            'description': "System access time expired. Make payment to resume use.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "System access time expired. Make payment to resume use."}
+                }
+            },
+        },
+    }
+)
+@limiter.limit("25/minute")
+async def get_changes(
+    request: Request,
+    query: Annotated[MareChangesQueryParams, Depends()],
+    mare_service: Annotated[MareService, Depends()],
+    current_user: Annotated[User, Depends(validate_paid_user)]
+):
+    """
+    List the mares created, edited or closed since the last sync
+
+    Keep the returned **next_cursor** and send it as **since** on the next sync.
+    While **has_more** is true there are more changes to fetch right away.
+    Mares with **active_pregnancy** false were closed and must be removed from
+    the local copy; **id** identifies a mare across renames.
+
+    - **since**: OPTIONAL The next_cursor of the last sync; omit it for a full sync
+    - **size**: The number of items per page
+    """
+    return await mare_service.get_changes(current_user.id, query.since, query.size)
 
 @mare_router.post(
     '/create',
@@ -113,18 +221,163 @@ async def create(
         current_user.id
     )
 
-    await async_redis_client.hincryby_fields(
-        f"user:{current_user.id}",
-        total_pregnancies=1,
-        pregnancies_in_progress=1
-    )
+    await enqueue_counters_drain()
 
     return new_mare
 
+@mare_router.post(
+    '/import',
+    status_code=status.HTTP_200_OK,
+    response_model=MareImportResultSchema,
+    responses={
+        status.HTTP_409_CONFLICT: {
+            'description': "Some of the mares were created while the file was imported.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "Some of the mares were created meanwhile; import the file again"}
+                }
+            },
+        },
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE: {
+            'description': "The file has too many bytes or too many mares.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "Import files are limited to 5000 mares"}
+                }
+            },
+        },
+        status.HTTP_415_UNSUPPORTED_MEDIA_TYPE: {
+            'description': "The body is neither CSV nor NDJSON.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "Send the mares as text/csv or application/x-ndjson"}
+                }
+            },
+        },
+        status.HTTP_429_TOO_MANY_REQUESTS : {
+            'description': "You are sending too many requests.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "You are sending too many requests."}
+                }
+            },
+        },
+        status.HTTP_402_PAYMENT_REQUIRED : {
+            'description': "System access time expired. Make payment to resume use.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "System access time expired. Make payment to resume use."}
+                }
+            },
+        },
+    }
+)
+@limiter.limit("5/minute")
+async def import_mares(
+    request: Request,
+    mare_service: Annotated[MareService, Depends()],
+    current_user: Annotated[User, Depends(validate_paid_user)]
+):
+    """
+    Register many mares at once from the request body
+
+    Send a **text/csv** body with a header line, or an **application/x-ndjson**
+    body with one JSON object per line. Each mare has the same fields as in
+    /mares/create. Valid mares are registered and the invalid ones are returned
+    in **errors** with their line number.
+    """
+    media_type = get_import_media_type(request.headers.get('Content-Type'))
+    lines = await read_import_lines(request.stream(), settings.MARE_IMPORT_MAX_BYTES)
+    rows, errors = parse_mare_import(lines, media_type, settings.MARE_IMPORT_MAX_ROWS)
+
+    imported, conflict_errors = await mare_service.import_mares(rows, current_user.id)
+    if imported:
+        await enqueue_counters_drain()
+
+    return MareImportResultSchema(
+        imported=imported,
+        errors=sorted(errors + conflict_errors, key=lambda error: error.line)
+    )
+
+@mare_router.get(
+    '/export',
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {
+            'description': "The mares, one per line.",
+            'content': {
+                'text/csv': {},
+                'application/x-ndjson': {},
+            },
+        },
+        status.HTTP_429_TOO_MANY_REQUESTS : {
+            'description': "You are sending too many requests.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "You are sending too many requests."}
+                }
+            },
+        },
+        status.HTTP_402_PAYMENT_REQUIRED : {
+            'description': "System access time expired. Make payment to resume use.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "System access time expired. Make payment to resume use."}
+                }
+            },
+        },
+    }
+)
+@limiter.limit("5/minute")
+async def export(
+    request: Request,
+    query: Annotated[MareExportQueryParams, Depends()],
+    current_user: Annotated[User, Depends(validate_paid_user)]
+):
+    """
+    Download every active mare as a CSV or NDJSON file
+
+    The CSV columns are the same accepted by /mares/import, so the file can be
+    imported back.
+
+    - **export_format**: OPTIONAL CSV (default) or NDJSON
+    - **include_schedule**: OPTIONAL Add the managment schedule of each mare
+    - **mare_type**: OPTIONAL Export only the mares of this type
+    """
+    user_id = current_user.id
+
+    # Dependency sessions are closed before the body is sent, so the stream
+    # keeps its own session open while it reads.
+    async def stream():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            mares = MareService(session).stream_mares(
+                user_id,
+                query.mare_type,
+                settings.MARE_EXPORT_BATCH_SIZE
+            )
+            async for chunk in export_mares(
+                mares,
+                query.export_format,
+                query.include_schedule,
+                settings.MARE_EXPORT_BATCH_SIZE
+            ):
+                yield chunk
+
+    extension = query.export_format.value.lower()
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[query.export_format],
+        headers={'Content-Disposition': f'attachment; filename="mares.{extension}"'}
+    )
+
 @mare_router.get(
     '/visualize',
     status_code=status.HTTP_200_OK,
     responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            'description': "The If-None-Match ETag still matches; the body is empty.",
+        },
         status.HTTP_403_FORBIDDEN: {
             'description': "You're not allowed to access this mare.",
             'content': {
@@ -165,23 +418,90 @@ async def visualize(
     - **mare_name**: Name of the mare you are looking to view
     """
 
-    mare = await mare_service.get_mare(mare_name, current_user.id)
+    async def load():
+        mare = await mare_service.get_mare(mare_name, current_user.id)
 
-    managment_schedule = get_managment_schedule(mare.pregnancy_date)
+        managment_schedule = get_managment_schedule(mare.pregnancy_date)
 
-    if mare.mare_type == MareType.HEADQUARTERS:
-        managment_schedule.pop("P4", None)
-    
-    return {
-        "mare": mare,
-        "managment_schedule": managment_schedule
+        if mare.mare_type == MareType.HEADQUARTERS:
+            managment_schedule.pop("P4", None)
+
+        return {
+            "mare": mare,
+            "managment_schedule": managment_schedule
+        }
+
+    return await response_cache.get_or_set(
+        request,
+        current_user.id,
+        {'mare_name': mare_name},
+        load
+    )
+
+@mare_router.get(
+    '/managment-schedule',
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            'description': "The If-None-Match ETag still matches; the body is empty.",
+        },
+        status.HTTP_429_TOO_MANY_REQUESTS : {
+            'description': "You are sending too many requests.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "You are sending too many requests."}
+                }
+            },
+        },
+        status.HTTP_402_PAYMENT_REQUIRED : {
+            'description': "System access time expired. Make payment to resume use.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "System access time expired. Make payment to resume use."}
+                }
+            },
+        },
+    },
+)
+@limiter.limit("25/minute")
+async def managment_schedule(
+    request: Request,
+    pregnancy_date: datetime,
+    current_user: Annotated[User, Depends(validate_paid_user)],
+    mare_type: Optional[MareType] = None
+):
+    """
+    Calculate the managment schedule of a pregnancy
+
+    The schedule only depends on the parameters, so the response can be kept
+    by the client for a day and revalidated with its ETag.
+
+    - **pregnancy_date**: Pregnancy date of the mare
+    - **mare_type**: OPTIONAL Mare's type; HEADQUARTERS mares have no P4 schedule
+    """
+    params = json.dumps([pregnancy_date.isoformat(), mare_type and mare_type.value])
+    headers = {
+        'ETag': f'"{hashlib.sha256(params.encode()).hexdigest()[:32]}"',
+        'Cache-Control': f'private, max-age={MANAGMENT_SCHEDULE_MAX_AGE_SECONDS}',
     }
+    if etag_matches(request.headers.get('If-None-Match'), headers['ETag']):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    schedule = get_managment_schedule(pregnancy_date)
+
+    if mare_type == MareType.HEADQUARTERS:
+        schedule.pop("P4", None)
+
+    return JSONResponse(content=jsonable_encoder(schedule), headers=headers)
 
 @mare_router.get(
     '/visualize-birthforecast-beetwen',
     status_code=status.HTTP_200_OK,
-    response_model=Page[MareSchema],
+    response_model=MarePage,
     responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            'description': "The If-None-Match ETag still matches; the body is empty.",
+        },
         status.HTTP_429_TOO_MANY_REQUESTS : {
             'description': "You are sending too many requests..",
             'content': {
@@ -214,23 +534,34 @@ async def visualize_birthforecast_beetwen(
     - **end_date**: Final date of interval
     - **page**: The page that you want see
     - **size**: The number of items per page
+    - **include_total**: OPTIONAL Set to false to skip counting the total of items
+    - **pagination_mode**: OPTIONAL OFFSET (default) or CURSOR for keyset pagination
+    - **cursor**: OPTIONAL The next_cursor of the previous page, in CURSOR mode
     - **mare_type**: OPTIONAL Mare's that will be returned by their type
     """
-    params = Params(page=query.page, size=query.size)
-    mares = await mare_service.get_mare_birthforecast(
-        query.start_date,
-        query.end_date,
+    params = query.pagination_params()
+    return await response_cache.get_or_set(
+        request,
         current_user.id,
-        params
+        query.model_dump(),
+        lambda: mare_service.get_mare_birthforecast(
+            query.start_date,
+            query.end_date,
+            current_user.id,
+            params,
+            query.include_total
+        ),
+        MarePage
     )
-    
-    return mares
 
 @mare_router.get(
     '/visualize-p4-beetwen',
     status_code=status.HTTP_200_OK,
-    response_model=Page[MareSchema],
+    response_model=MarePage,
     responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            'description': "The If-None-Match ETag still matches; the body is empty.",
+        },
         status.HTTP_429_TOO_MANY_REQUESTS : {
             'description': "You are sending too many requests..",
             'content': {
@@ -263,28 +594,34 @@ async def visualize_p4_beetwen(
     - **end_date**: Final date of interval
     - **page**: The page that you want see
     - **size**: The number of items per page
+    - **include_total**: OPTIONAL Set to false to skip counting the total of items
+    - **pagination_mode**: OPTIONAL OFFSET (default) or CURSOR for keyset pagination
+    - **cursor**: OPTIONAL The next_cursor of the previous page, in CURSOR mode
     - **mare_type**: OPTIONAL Mare's that will be returned by their type
     """
-    params = Params(page=query.page, size=query.size)
-    paginated = await mare_service.get_mare_by_earlist(
-        query.start_date - timedelta(105),
-        query.end_date,
+    params = query.pagination_params()
+    return await response_cache.get_or_set(
+        request,
         current_user.id,
-        params
+        query.model_dump(),
+        lambda: mare_service.get_mare_p4_beetwen(
+            query.start_date,
+            query.end_date,
+            current_user.id,
+            params,
+            query.include_total
+        ),
+        MarePage
     )
 
-    filtered_items = [
-        mare for mare in paginated.items
-        if is_in_p4_range(mare.pregnancy_date, query.start_date, query.end_date) and mare.mare_type == MareType.RECEIVER
-    ]
-
-    return Page.create(items=filtered_items, total=len(filtered_items), params=params)
-
 @mare_router.get(
     '/visualize-herpes-beetwen',
     status_code=status.HTTP_200_OK,
-    response_model=Page[MareSchema],
+    response_model=MarePage,
     responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            'description': "The If-None-Match ETag still matches; the body is empty.",
+        },
         status.HTTP_429_TOO_MANY_REQUESTS : {
             'description': "You are sending too many requests..",
             'content': {
@@ -317,32 +654,31 @@ async def visualize_herpes_beetwen(
     - **end_date**: Final date of interval
     - **page**: The page that you want see
     - **size**: The number of items per page
+    - **include_total**: OPTIONAL Set to false to skip counting the total of items
+    - **pagination_mode**: OPTIONAL OFFSET (default) or CURSOR for keyset pagination
+    - **cursor**: OPTIONAL The next_cursor of the previous page, in CURSOR mode
     - **mare_type**: OPTIONAL Mare's that will be returned by their type
     """
-    params = Params(page=query.page, size=query.size)
-    paginated = await mare_service.get_mare_by_earlist(
-        query.start_date - timedelta(270),
-        query.end_date,
+    params = query.pagination_params()
+    return await response_cache.get_or_set(
+        request,
         current_user.id,
-        params
+        query.model_dump(),
+        lambda: mare_service.get_mare_herpes_beetwen(
+            query.start_date,
+            query.end_date,
+            current_user.id,
+            query.mare_type,
+            params,
+            query.include_total
+        ),
+        MarePage
     )
 
-    if query.mare_type:
-        filtered_items = [
-            mare for mare in paginated.items
-            if is_in_herpes_range(mare.pregnancy_date, query.start_date, query.end_date) and mare.mare_type == query.mare_type
-        ]
-    else:
-        filtered_items = [
-            mare for mare in paginated.items
-            if is_in_herpes_range(mare.pregnancy_date, query.start_date, query.end_date)
-        ]
-
-    return Page.create(items=filtered_items, total=len(filtered_items), params=params)
-
 @mare_router.get(
     '/graphic-counters',
     status_code=status.HTTP_200_OK,
+    response_model=GraphicCountersSchema,
     responses={
         status.HTTP_429_TOO_MANY_REQUESTS : {
             'description': "You are sending too many requests.",
@@ -365,12 +701,19 @@ async def visualize_herpes_beetwen(
 @limiter.limit("50/minute")
 async def graphic_counters(
     request: Request,
+    counter_service: Annotated[PregnancyCounterService, Depends()],
     current_user: Annotated[User, Depends(validate_paid_user)]
 ):
     """
     Return the statistic of user account
+
+    Besides the account counters, **outcomes** groups the closed pregnancies
+    by month, by stallion and by mare type.
     """
-    return await async_redis_client.hget_all(f"user:{current_user.id}")
+    counters = await async_redis_client.hget_all(f"user:{current_user.id}")
+    outcomes = await counter_service.get_outcome_stats(current_user.id)
+
+    return GraphicCountersSchema(**counters, outcomes=outcomes)
 
 @mare_router.put(
     '/edit',
@@ -475,5 +818,5 @@ async def delete(
     - **mare_name**: Name of mare to be deleted
     - **delete_type**: Type of delete (SUCCESS_PREGNANCY or FAIL_PREGNANCY)
     """
-    await mare_service.delete_mare(query.mare_name, current_user.id)
-    await update_success_or_fail_counters(user_id=current_user.id, delete_type=query.delete_type)
\ No newline at end of file
+    await mare_service.delete_mare(query.mare_name, current_user.id, query.delete_type)
+    await enqueue_counters_drain()
\ No newline at end of file
@@ -1,6 +1,7 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, status, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
 from equigest.settings import Settings
 
@@ -11,9 +12,15 @@ from equigest.integrations.abacatepay.service import (
     get_abacatepay_integration_service
 )
 
+from equigest.services.user import (
+    UserService,
+)
+
 from equigest.utils.security.oauth_token import get_current_user
 
-from equigest.tasks import process_billing_paid
+from equigest.infra.redis_client import async_redis_client
+
+from equigest.tasks import process_billing_paid, billing_deduplication_key
 
 from equigest.setup import limiter
 
@@ -27,6 +34,22 @@ payment_router = APIRouter(prefix='/payments')
     '/create-billing',
     status_code=status.HTTP_201_CREATED,
     responses={
+        status.HTTP_409_CONFLICT : {
+            'description': "AbacatePay customer is being created.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "AbacatePay customer is being created, try again shortly"}
+                }
+            },
+        },
+        status.HTTP_422_UNPROCESSABLE_ENTITY : {
+            'description': "Customer rejected by AbacatePay.",
+            'content': {
+                'application/json': {
+                    'example': {'detail': "Customer rejected by AbacatePay. Invalid taxId"}
+                }
+            },
+        },
         status.HTTP_502_BAD_GATEWAY : {
             'description': "Error in billing create.",
             'content': {
@@ -41,12 +64,21 @@ payment_router = APIRouter(prefix='/payments')
 async def create_billing(
     request: Request,
     current_user: Annotated[User, Depends(get_current_user)],
+    user_service: Annotated[UserService, Depends()],
     abacatepay_service: Annotated[AbacatePayIntegrationService, Depends(get_abacatepay_integration_service)],
 ):
     """
     Create a new billing
     """
-    billing_data = abacatepay_service.create_billing(current_user)
+    if not current_user.abacatepay_client_id:
+        current_user = await user_service.ensure_abacatepay_customer(current_user.id, abacatepay_service)
+        if current_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail='AbacatePay customer is being created, try again shortly'
+            )
+
+    billing_data = await abacatepay_service.create_billing(current_user)
 
     return billing_data
 
@@ -74,6 +106,30 @@ async def webhook_listener(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid webhook secret")
 
     payload = await request.json()
-    process_billing_paid.delay(payload)
-    
+
+    billing_data = payload.get('data', {}).get('billing', {})
+    billing_id = billing_data.get('id')
+    if billing_data.get('status') != "PAID" or not billing_id:
+        return payload
+
+    # Redeliveries of a billing are answered with 200 without being enqueued.
+    # processed_billings still guards the credit if this key is lost, and the
+    # task drops the key once its retries run out.
+    dedup_key = billing_deduplication_key(billing_id)
+    if not await async_redis_client.set(
+        dedup_key,
+        '1',
+        ex=settings.WEBHOOK_DEDUPLICATION_TTL_SECONDS,
+        nx=True
+    ):
+        return payload
+
+    try:
+        # Publishing to the broker is blocking I/O, kept off the event loop
+        await run_in_threadpool(process_billing_paid.delay, payload)
+    except Exception:
+        # Let AbacatePay's retry through once the broker is back
+        await async_redis_client.delete(dedup_key)
+        raise
+
     return payload
\ No newline at end of file
@@ -12,6 +12,21 @@ class MareSchema(BaseModel):
     donor_name: Optional[str] = None
     pregnancy_date: datetime
 
+class MareChangeSchema(BaseModel):
+    id: int
+    mare_name: str
+    mare_type: MareType
+    stallion_name: str
+    donor_name: Optional[str] = None
+    pregnancy_date: datetime
+    active_pregnancy: bool
+    updated_at: datetime
+
+class MareChangesPage(BaseModel):
+    items: list[MareChangeSchema]
+    next_cursor: Optional[str] = None
+    has_more: bool
+
 class MareCreateOrEditSchema(BaseModel):
     mare_name: str
     mare_type: MareType
@@ -19,6 +34,31 @@ class MareCreateOrEditSchema(BaseModel):
     donor_name: Optional[str] = None
     pregnancy_date: datetime
 
+class MareImportErrorSchema(BaseModel):
+    line: int
+    errors: list[str]
+
+class MareImportResultSchema(BaseModel):
+    imported: int
+    errors: list[MareImportErrorSchema]
+
 class DeleteMareSchema(BaseModel):
     mare_name: str
     delete_type: DeleteType
+
+class OutcomeBucketSchema(BaseModel):
+    bucket: str
+    successful_pregnancies: int
+    failed_pregnancies: int
+
+class OutcomeStatsSchema(BaseModel):
+    by_month: list[OutcomeBucketSchema]
+    by_stallion: list[OutcomeBucketSchema]
+    by_mare_type: list[OutcomeBucketSchema]
+
+class GraphicCountersSchema(BaseModel):
+    total_pregnancies: int = 0
+    pregnancies_in_progress: int = 0
+    failed_pregnancies: int = 0
+    successful_pregnancies: int = 0
+    outcomes: OutcomeStatsSchema
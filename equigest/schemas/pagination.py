@@ -0,0 +1,14 @@
+from typing import Generic, Optional, Sequence, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar('T')
+
+class CursorParams(BaseModel):
+    size: int
+    cursor: Optional[str] = None
+
+class CursorPage(BaseModel, Generic[T]):
+    items: Sequence[T]
+    size: int
+    next_cursor: Optional[str] = None
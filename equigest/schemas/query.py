@@ -1,18 +1,42 @@
+from typing import Optional
+
 from pydantic import BaseModel
 from datetime import date
 
 from fastapi import Query
 
-from equigest.enums.enums import MareType
+from fastapi_pagination import Params
 
-class MareQueryParams(BaseModel):
-    start_date: date = Query(..., description="Data inicial do intervalo")
-    end_date: date = Query(..., description="Data final do intervalo")
+from equigest.enums.enums import MareType, PaginationMode, ExportFormat
+
+from equigest.schemas.pagination import CursorParams
+
+class PaginationQueryParams(BaseModel):
     page: int = Query(1, ge=1, description="Número da página")
     size: int = Query(10, ge=1, le=100, description="Itens por página")
-    mare_type: MareType = None
+    include_total: bool = Query(True, description="Calcular o total de itens")
+    pagination_mode: PaginationMode = Query(PaginationMode.OFFSET, description="Paginação por página (OFFSET) ou por cursor (CURSOR)")
+    cursor: Optional[str] = Query(None, description="Cursor retornado pela página anterior")
+
+    def pagination_params(self) -> Params | CursorParams:
+        if self.pagination_mode == PaginationMode.CURSOR:
+            return CursorParams(size=self.size, cursor=self.cursor)
+
+        return Params(page=self.page, size=self.size)
 
-class MareQueryByBirthForecastParams(BaseModel):
+class MareQueryParams(PaginationQueryParams):
+    start_date: date = Query(..., description="Data inicial do intervalo")
+    end_date: date = Query(..., description="Data final do intervalo")
+    mare_type: Optional[MareType] = None
+
+class MareQueryByBirthForecastParams(PaginationQueryParams):
     mare_type: str
-    page: int = Query(1, ge=1, description="Número da página")
-    size: int = Query(10, ge=1, le=100, description="Itens por página")
+
+class MareChangesQueryParams(BaseModel):
+    since: Optional[str] = Query(None, description="Cursor retornado pela última sincronização")
+    size: int = Query(100, ge=1, le=500, description="Itens por página")
+
+class MareExportQueryParams(BaseModel):
+    export_format: ExportFormat = Query(ExportFormat.CSV, description="Formato do arquivo (CSV ou NDJSON)")
+    include_schedule: bool = Query(False, description="Incluir o calendário de manejo de cada égua")
+    mare_type: Optional[MareType] = Query(None, description="Exportar apenas éguas deste tipo")
@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
 
 from datetime import datetime, timedelta
 
@@ -17,4 +19,17 @@ class UserSchema(BaseModel):
     id: int
     username: str
     next_payment_date: datetime
-    payment_status: PaymentAccessStatus
\ No newline at end of file
+    payment_status: PaymentAccessStatus
+
+class CachedUserSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    username: str
+    cellphone: str
+    email: str
+    cpf_cnpj: str
+    abacatepay_client_id: Optional[str] = None
+    next_payment_date: Optional[datetime] = None
+    payment_status: PaymentAccessStatus
+    created_at: datetime
@@ -0,0 +1,249 @@
+import logging
+
+from collections import Counter, defaultdict
+from enum import Enum
+
+from fastapi import Depends
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, literal_column
+
+import redis.asyncio as redis
+
+from equigest.infra.session import get_session
+from equigest.infra.redis_client import async_redis_client
+
+from equigest.models.mares import Mare
+from equigest.models.user import User
+from equigest.models.pregnancy_outcomes import PregnancyOutcome, PregnancyCounterBaseline
+
+from equigest.schemas.mare import OutcomeBucketSchema, OutcomeStatsSchema
+
+from equigest.services.outbox import OutboxService
+
+from equigest.enums.enums import OutboxTopic, DeleteType
+
+from equigest.settings import Settings
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+def counters_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+def outcome_stats_key(user_id: int) -> str:
+    return f"user:{user_id}:outcome-stats"
+
+class PregnancyCounterService:
+    def __init__(self, session: AsyncSession = Depends(get_session)):
+        self.session = session
+        self.redis_client = async_redis_client
+        self.outbox_service = OutboxService(session)
+
+    def record_increments(self, user_id: int, **fields: int):
+        self.outbox_service.add_event(OutboxTopic.PREGNANCY_COUNTERS, user_id, fields)
+
+    async def drain_outbox(self, batch_size: int = 500) -> int:
+        drained = 0
+
+        while True:
+            events = await self.outbox_service.claim_pending_events(
+                OutboxTopic.PREGNANCY_COUNTERS,
+                batch_size
+            )
+            if not events:
+                return drained
+
+            increments: defaultdict[str, Counter] = defaultdict(Counter)
+            for event in events:
+                increments[counters_key(event.aggregate_id)].update(event.payload)
+
+            # Redis first: if it fails the rows are released by the rollback
+            # and retried. A crash between both steps can apply a batch twice,
+            # which rebuild_all repairs.
+            await self.redis_client.hincrby_many(increments)
+            await self.outbox_service.mark_events_processed([event.id for event in events])
+            await self.session.commit()
+
+            drained += len(events)
+            if len(events) < batch_size:
+                return drained
+
+    async def _outcome_buckets(self, user_id: int, bucket) -> list[OutcomeBucketSchema]:
+        result = await self.session.execute(
+            select(
+                bucket.label('bucket'),
+                func.count().filter(
+                    PregnancyOutcome.outcome == DeleteType.SUCCESS_PREGNANCY
+                ).label('successful_pregnancies'),
+                func.count().filter(
+                    PregnancyOutcome.outcome == DeleteType.FAIL_PREGNANCY
+                ).label('failed_pregnancies'),
+            )
+            .where(PregnancyOutcome.user_owner == user_id)
+            .group_by(bucket)
+            .order_by(bucket)
+        )
+
+        return [
+            OutcomeBucketSchema(
+                bucket=row.bucket.value if isinstance(row.bucket, Enum) else row.bucket,
+                successful_pregnancies=row.successful_pregnancies,
+                failed_pregnancies=row.failed_pregnancies
+            )
+            for row in result.all()
+        ]
+
+    async def get_outcome_stats(self, user_id: int) -> OutcomeStatsSchema:
+        key = outcome_stats_key(user_id)
+        try:
+            cached = await self.redis_client.get(key)
+        except redis.RedisError:
+            cached = None
+        if cached is not None:
+            return OutcomeStatsSchema.model_validate_json(cached)
+
+        closed_month = func.to_char(
+            func.timezone(literal_column("'UTC'"), PregnancyOutcome.closed_at),
+            literal_column("'YYYY-MM'")
+        )
+        stats = OutcomeStatsSchema(
+            by_month=await self._outcome_buckets(user_id, closed_month),
+            by_stallion=await self._outcome_buckets(user_id, PregnancyOutcome.stallion_name),
+            by_mare_type=await self._outcome_buckets(user_id, PregnancyOutcome.mare_type),
+        )
+
+        try:
+            await self.redis_client.set(
+                key,
+                stats.model_dump_json(),
+                ex=settings.OUTCOME_STATS_CACHE_TTL_SECONDS
+            )
+        except redis.RedisError:
+            pass
+
+        return stats
+
+    async def invalidate_outcome_stats(self, user_id: int):
+        try:
+            await self.redis_client.delete(outcome_stats_key(user_id))
+        except redis.RedisError:
+            # The close is already committed; the stats expire with their TTL
+            logger.exception('Failed to invalidate outcome stats of user %s', user_id)
+
+    async def _capture_baselines(
+        self,
+        outcomes: defaultdict[int, Counter],
+        pending_increments: defaultdict[int, Counter],
+        batch_size: int
+    ):
+        # Redis already includes every drained outcome; pending events are
+        # added so the recorded outcomes can be subtracted from both.
+        baselines = (await self.session.scalars(
+            select(PregnancyCounterBaseline)
+            .where(PregnancyCounterBaseline.successful_pregnancies.is_(None))
+            .order_by(PregnancyCounterBaseline.user_id)
+        )).all()
+
+        for start in range(0, len(baselines), batch_size):
+            batch = baselines[start:start + batch_size]
+            current = await self.redis_client.hget_all_many(
+                [counters_key(baseline.user_id) for baseline in batch]
+            )
+
+            for baseline, stored in zip(batch, current):
+                pending = pending_increments[baseline.user_id]
+                recorded = outcomes[baseline.user_id]
+                baseline.successful_pregnancies = max(
+                    stored.get('successful_pregnancies', 0)
+                    + pending['successful_pregnancies']
+                    - recorded[DeleteType.SUCCESS_PREGNANCY],
+                    0
+                )
+                baseline.failed_pregnancies = max(
+                    stored.get('failed_pregnancies', 0)
+                    + pending['failed_pregnancies']
+                    - recorded[DeleteType.FAIL_PREGNANCY],
+                    0
+                )
+
+    async def rebuild_all(self, batch_size: int = 1000) -> int:
+        # Every counter is derived from Postgres. Pending events are already
+        # reflected in the tables, so they are claimed before counting and
+        # closed instead of applied.
+        #
+        # Claims and counts share one REPEATABLE READ snapshot: a write that
+        # commits in between is neither counted nor claimed, and the next
+        # drain applies it. Events held by a running drain are waited for
+        # instead of skipped; once that drain commits Postgres aborts the
+        # rebuild with a serialization failure before Redis is touched, and
+        # the command can simply be run again.
+        await self.session.connection(
+            execution_options={'isolation_level': 'REPEATABLE READ'}
+        )
+
+        pending_events = []
+        while True:
+            events = await self.outbox_service.claim_pending_events(
+                OutboxTopic.PREGNANCY_COUNTERS,
+                batch_size,
+                after_id=pending_events[-1].id if pending_events else 0,
+                skip_locked=False
+            )
+            pending_events.extend(events)
+            if len(events) < batch_size:
+                break
+
+        pending_increments: defaultdict[int, Counter] = defaultdict(Counter)
+        for event in pending_events:
+            pending_increments[event.aggregate_id].update(event.payload)
+
+        in_progress_result = await self.session.execute(
+            select(Mare.user_owner, func.count())
+            .where(Mare.active_pregnancy)
+            .group_by(Mare.user_owner)
+        )
+        in_progress = dict(in_progress_result.all())
+
+        outcomes_result = await self.session.execute(
+            select(PregnancyOutcome.user_owner, PregnancyOutcome.outcome, func.count())
+            .group_by(PregnancyOutcome.user_owner, PregnancyOutcome.outcome)
+        )
+        outcomes: defaultdict[int, Counter] = defaultdict(Counter)
+        for user_id, outcome, count in outcomes_result.all():
+            outcomes[user_id][outcome] = count
+
+        # Outcomes closed before pregnancy_outcomes existed live on as a
+        # per-user baseline, captured from Redis on the first rebuild
+        await self._capture_baselines(outcomes, pending_increments, batch_size)
+        baselines = {
+            baseline.user_id: baseline
+            for baseline in await self.session.scalars(select(PregnancyCounterBaseline))
+        }
+
+        user_ids = (await self.session.scalars(select(User.id).order_by(User.id))).all()
+
+        for start in range(0, len(user_ids), batch_size):
+            mappings = {}
+            for user_id in user_ids[start:start + batch_size]:
+                baseline = baselines.get(user_id)
+                successful = outcomes[user_id][DeleteType.SUCCESS_PREGNANCY]
+                failed = outcomes[user_id][DeleteType.FAIL_PREGNANCY]
+                if baseline is not None:
+                    successful += baseline.successful_pregnancies
+                    failed += baseline.failed_pregnancies
+                pregnancies_in_progress = in_progress.get(user_id, 0)
+
+                mappings[counters_key(user_id)] = {
+                    'total_pregnancies': pregnancies_in_progress + successful + failed,
+                    'pregnancies_in_progress': pregnancies_in_progress,
+                    'failed_pregnancies': failed,
+                    'successful_pregnancies': successful,
+                }
+
+            await self.redis_client.hset_many(mappings)
+
+        await self.outbox_service.mark_events_processed([event.id for event in pending_events])
+        await self.session.commit()
+
+        return len(user_ids)
@@ -1,2 +1,5 @@
 class UserAlreadyExists(Exception):
-    "Raised when a duplicate user tried to be registered in User Model"
\ No newline at end of file
+    "Raised when a duplicate user tried to be registered in User Model"
+
+class PasswordHashingBusy(Exception):
+    "Raised when the password hashing pool has too many pending jobs"
@@ -1,53 +1,230 @@
+from typing import AsyncIterator, Optional
+
 from fastapi import Depends, HTTPException, status
 
 from fastapi_pagination import Params, Page
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import Select, ColumnElement, Executable, select, insert, update, delete, func, tuple_
+
+from datetime import date, datetime, timedelta, timezone
 
-from datetime import date, timedelta
+from asyncpg.exceptions import UniqueViolationError
 
 from equigest.infra.session import get_session
+from equigest.infra.response_cache import response_cache
+
+from equigest.models.mares import Mare, birth_forecast_date
+from equigest.models.mare_events import MareEvent
+from equigest.models.pregnancy_outcomes import PregnancyOutcome
+from equigest.schemas.mare import (
+    MareCreateOrEditSchema,
+    MareChangeSchema,
+    MareChangesPage,
+    MareImportErrorSchema
+)
+
+from equigest.enums.enums import MareType, MareEventKind, DeleteType
+
+from equigest.schemas.pagination import CursorParams, CursorPage
 
-from equigest.models.mares import Mare
-from equigest.schemas.mare import MareCreateOrEditSchema
+from equigest.utils.pagination import paginate, paginate_by_cursor, encode_cursor, decode_cursor
+from equigest.utils.mare import build_mare_events, get_delete_counter_increments
 
-from equigest.enums.enums import MareType
+from equigest.services.counters import PregnancyCounterService
+
+from equigest.settings import Settings
+
+settings = Settings()
 
 
 class MareService:
     def __init__(self, session: AsyncSession = Depends(get_session)):
         self.session = session
+        self.counter_service = PregnancyCounterService(session)
+
+    async def _paginate(
+        self,
+        query: Select,
+        order_columns: list[ColumnElement],
+        params: Params | CursorParams,
+        include_total: bool
+    ) -> Page | CursorPage:
+        query = query.order_by(*order_columns)
+
+        if isinstance(params, CursorParams):
+            return await paginate_by_cursor(self.session, query, order_columns, params)
+
+        return await paginate(self.session, query, params, include_total)
+
+    def _due_mare_ids(
+        self,
+        user_id: int,
+        event_kind: MareEventKind,
+        start: date,
+        end: date
+    ) -> Select:
+        return select(MareEvent.mare_id).where(
+            MareEvent.user_owner == user_id,
+            MareEvent.due_date.between(start, end),
+            MareEvent.event_kind == event_kind
+        )
+
+    async def _scalar_or_conflict(self, statement: Executable, mare_name: str):
+        try:
+            return await self.session.scalar(statement)
+        except IntegrityError:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f'Mare with name "{mare_name}" already exists'
+            )
+
+    def _mare_not_found(self, mare_name: str) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Mare with name "{mare_name}" not found'
+        )
 
     async def create_mare(
         self,
         mare: MareCreateOrEditSchema,
         user_owner_id: int
     ) -> Mare:
-        new_mare = Mare(
-            **mare.model_dump(),
-            user_owner = user_owner_id
+        # INSERT ... RETURNING hands back every column, defaults included, so
+        # the mare never has to be refreshed after the commit.
+        new_mare = await self._scalar_or_conflict(
+            insert(Mare)
+            .values(**mare.model_dump(), user_owner=user_owner_id)
+            .returning(Mare),
+            mare.mare_name
         )
 
-        self.session.add(new_mare)
+        self.session.add_all(build_mare_events(new_mare))
+        self.counter_service.record_increments(
+            user_owner_id,
+            total_pregnancies=1,
+            pregnancies_in_progress=1
+        )
         await self.session.commit()
-        await self.session.refresh(new_mare)
+        await response_cache.bump_data_version(user_owner_id)
 
         return new_mare
     
+    async def import_mares(
+        self,
+        rows: list[tuple[int, MareCreateOrEditSchema]],
+        user_owner_id: int
+    ) -> tuple[int, list[MareImportErrorSchema]]:
+        """
+        Load already validated (line, mare) rows with COPY in one transaction.
+
+        Rows whose name is already taken are reported back instead of loaded.
+        COPY skips the ORM, so every column default is supplied here.
+        """
+        existing_names = set((await self.session.scalars(
+            select(Mare.mare_name).where(
+                Mare.user_owner == user_owner_id,
+                Mare.active_pregnancy,
+                Mare.mare_name.in_([mare.mare_name for _, mare in rows])
+            )
+        )).all()) if rows else set()
+
+        errors = [
+            MareImportErrorSchema(
+                line=line,
+                errors=[f'Mare with name "{mare.mare_name}" already exists']
+            )
+            for line, mare in rows if mare.mare_name in existing_names
+        ]
+        mares = [mare for _, mare in rows if mare.mare_name not in existing_names]
+        if not mares:
+            return 0, errors
+
+        now = datetime.now(timezone.utc)
+        connection = await self.session.connection()
+        driver_connection = (await connection.get_raw_connection()).driver_connection
+
+        try:
+            await driver_connection.copy_records_to_table(
+                Mare.__tablename__,
+                columns=[
+                    'mare_name', 'mare_type', 'stallion_name', 'user_owner', 'donor_name',
+                    'pregnancy_date', 'active_pregnancy', 'created_at', 'updated_at'
+                ],
+                records=[
+                    (
+                        mare.mare_name, mare.mare_type.name, mare.stallion_name, user_owner_id,
+                        mare.donor_name, mare.pregnancy_date, True, now, now
+                    )
+                    for mare in mares
+                ]
+            )
+        except UniqueViolationError:
+            # A mare with one of the names was created since the check above
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail='Some of the mares were created meanwhile; import the file again'
+            )
+
+        imported_mares = (await self.session.scalars(
+            select(Mare).where(
+                Mare.user_owner == user_owner_id,
+                Mare.active_pregnancy,
+                Mare.mare_name.in_([mare.mare_name for mare in mares])
+            )
+        )).all()
+
+        await driver_connection.copy_records_to_table(
+            MareEvent.__tablename__,
+            columns=['mare_id', 'user_owner', 'event_kind', 'due_date'],
+            records=[
+                (event.mare_id, event.user_owner, event.event_kind.name, event.due_date)
+                for mare in imported_mares
+                for event in build_mare_events(mare)
+            ]
+        )
+
+        self.counter_service.record_increments(
+            user_owner_id,
+            total_pregnancies=len(mares),
+            pregnancies_in_progress=len(mares)
+        )
+        await self.session.commit()
+        await response_cache.bump_data_version(user_owner_id)
+
+        return len(mares), errors
+
     async def edit_mare(
         self,
         mare_name: str,
         mare: MareCreateOrEditSchema,
         user_id: int,
     ) -> Mare:
-        existing_mare = await self.get_mare(mare_name, user_id)
-
-        for field, value in mare.model_dump(exclude_unset=True).items():
-            setattr(existing_mare, field, value)
+        # Matching and writing in one UPDATE leaves no gap between reading the
+        # mare and saving it for a concurrent request to slip into.
+        existing_mare = await self._scalar_or_conflict(
+            update(Mare)
+            .where(
+                Mare.user_owner == user_id,
+                Mare.mare_name == mare_name,
+                Mare.active_pregnancy
+            )
+            .values(**mare.model_dump(exclude_unset=True))
+            .returning(Mare),
+            mare.mare_name
+        )
+        if not existing_mare:
+            raise self._mare_not_found(mare_name)
 
+        await self.session.execute(
+            delete(MareEvent).where(MareEvent.mare_id == existing_mare.id)
+        )
+        self.session.add_all(build_mare_events(existing_mare))
         await self.session.commit()
-        await self.session.refresh(existing_mare)
+        await response_cache.bump_data_version(user_id)
 
         return existing_mare
 
@@ -55,82 +232,129 @@ class MareService:
         self,
         user_id: int,
         mare_type: MareType,
-        params: Params
-    ) -> list[Mare]:
+        params: Params | CursorParams,
+        include_total: bool = True
+    ) -> Page | CursorPage:
         query = select(Mare).where(
             Mare.user_owner == user_id,
+            Mare.active_pregnancy,
             Mare.mare_type == mare_type
         )
 
-        total_result = await self.session.execute(query)
-        total = total_result.scalars().all()
-        total_count = len(total)
-
-        offset = (params.page - 1) * params.size
-        limit = params.size
-
-        query = query.offset(offset).limit(limit)
-        result = await self.session.execute(query)
-        items = result.scalars().all()
+        return await self._paginate(query, [Mare.mare_name, Mare.id], params, include_total)
 
-        return Page.create(items, total=total_count, params=params)
 
-
-    async def get_mare_by_earlist(
+    async def get_mare_p4_beetwen(
         self,
-        earlist_pregnancy: date,
+        start: date,
         end: date,
         user_id: int,
-        params: Params
-    ) -> list[Mare]:
+        params: Params | CursorParams,
+        include_total: bool = True
+    ) -> Page | CursorPage:
 
         query = select(Mare).where(
-                Mare.pregnancy_date.between(
-                    earlist_pregnancy,
-                    end
-                ),
-                Mare.user_owner == user_id
-            )
+            Mare.user_owner == user_id,
+            Mare.active_pregnancy,
+            Mare.id.in_(self._due_mare_ids(user_id, MareEventKind.P4, start, end))
+        )
 
-        total_result = await self.session.execute(query)
-        total = total_result.scalars().all()
-        total_count = len(total)
+        return await self._paginate(query, [Mare.pregnancy_date, Mare.id], params, include_total)
 
-        offset = (params.page - 1) * params.size
-        limit = params.size
+    async def get_mare_herpes_beetwen(
+        self,
+        start: date,
+        end: date,
+        user_id: int,
+        mare_type: Optional[MareType],
+        params: Params | CursorParams,
+        include_total: bool = True
+    ) -> Page | CursorPage:
 
-        query = query.offset(offset).limit(limit)
-        result = await self.session.execute(query)
-        items = result.scalars().all()
+        query = select(Mare).where(
+            Mare.user_owner == user_id,
+            Mare.active_pregnancy,
+            Mare.id.in_(self._due_mare_ids(user_id, MareEventKind.HERPES_VACCINE, start, end))
+        )
+        if mare_type:
+            query = query.where(Mare.mare_type == mare_type)
 
-        return Page.create(items, total=total_count, params=params)
+        return await self._paginate(query, [Mare.pregnancy_date, Mare.id], params, include_total)
 
     async def get_mare_birthforecast(
         self,
         start: date,
         end: date,
         user_id: int,
-        params: Params
-    ) -> list[Mare]:
+        params: Params | CursorParams,
+        include_total: bool = True
+    ) -> Page | CursorPage:
 
         query = select(Mare).where(
-            Mare.pregnancy_date + timedelta(days=335) >= start,
-            Mare.pregnancy_date + timedelta(days=335) <= end,
-            Mare.user_owner == user_id
+            Mare.user_owner == user_id,
+            Mare.active_pregnancy,
+            birth_forecast_date >= start,
+            birth_forecast_date <= end
         )
 
-        total_result = await self.session.execute(query)
-        total = total_result.scalars().all()
-        total_count = len(total)
+        return await self._paginate(query, [Mare.pregnancy_date, Mare.id], params, include_total)
 
-        offset = (params.page - 1) * params.size
-        limit = params.size
+    async def stream_mares(
+        self,
+        user_id: int,
+        mare_type: Optional[MareType],
+        batch_size: int
+    ) -> AsyncIterator[Mare]:
+        # yield_per reads through a server-side cursor, batch_size rows at a
+        # time, instead of loading the whole herd.
+        query = select(Mare).where(
+            Mare.user_owner == user_id,
+            Mare.active_pregnancy
+        ).order_by(Mare.mare_name, Mare.id).execution_options(yield_per=batch_size)
+        if mare_type:
+            query = query.where(Mare.mare_type == mare_type)
 
-        query = query.offset(offset).limit(limit)
-        result = await self.session.execute(query)
-        items = result.scalars().all()
+        result = await self.session.stream_scalars(query)
+        async for mare in result:
+            yield mare
 
-        return Page.create(items, total=total_count, params=params)
+    async def get_changes(
+        self,
+        user_id: int,
+        since: Optional[str],
+        size: int
+    ) -> MareChangesPage:
+        order_columns = [Mare.updated_at, Mare.id]
+
+        # updated_at is the transaction start time, so a write can commit with
+        # a timestamp older than rows already synced. Rows are only handed out
+        # once they are past the settle window to keep those from being skipped.
+        query = select(Mare).where(
+            Mare.user_owner == user_id,
+            Mare.updated_at < func.now() - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS)
+        )
+        if since:
+            last_values = decode_cursor(since, order_columns)
+            query = query.where(tuple_(*order_columns) > tuple_(*last_values))
+        else:
+            # A first sync has no local copy to remove closed pregnancies from
+            query = query.where(Mare.active_pregnancy)
+
+        result = await self.session.scalars(query.order_by(*order_columns).limit(size + 1))
+        mares = result.all()
+
+        has_more = len(mares) > size
+        mares = mares[:size]
+
+        next_cursor = since
+        if mares:
+            next_cursor = encode_cursor([mares[-1].updated_at, mares[-1].id])
+
+        return MareChangesPage(
+            items=[MareChangeSchema.model_validate(mare, from_attributes=True) for mare in mares],
+            next_cursor=next_cursor,
+            has_more=has_more
+        )
 
     async def get_mare(
         self,
@@ -138,21 +362,59 @@ class MareService:
         user_id: int
     ) -> Mare:
         mare = await self.session.scalar(
-            select(Mare).where(Mare.mare_name == mare_name, Mare.user_owner == user_id)
+            select(Mare).where(
+                Mare.mare_name == mare_name,
+                Mare.user_owner == user_id,
+                Mare.active_pregnancy
+            )
         )
         if not mare:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f'Mare with name "{mare_name}" not found'
-            )
-        
+            raise self._mare_not_found(mare_name)
+
+        return mare
+
     async def delete_mare(
             self,
             mare_name: str,
-            user_id: int
+            user_id: int,
+            delete_type: DeleteType
     ) -> dict:
-        mare = await self.get_mare(mare_name, user_id)
-        self.session.delete(mare)
+        # The mare is closed rather than deleted and its outcome archived,
+        # which is what the outcome statistics are computed from. The
+        # active_pregnancy condition makes concurrent closes of the same mare
+        # match only once.
+        closed_mare = (await self.session.execute(
+            update(Mare)
+            .where(
+                Mare.user_owner == user_id,
+                Mare.mare_name == mare_name,
+                Mare.active_pregnancy
+            )
+            .values(active_pregnancy=False)
+            .returning(Mare.id, Mare.mare_type, Mare.stallion_name, Mare.pregnancy_date)
+        )).one_or_none()
+        if not closed_mare:
+            raise self._mare_not_found(mare_name)
+
+        await self.session.execute(
+            delete(MareEvent).where(MareEvent.mare_id == closed_mare.id)
+        )
+        self.session.add(
+            PregnancyOutcome(
+                mare_id=closed_mare.id,
+                user_owner=user_id,
+                outcome=delete_type,
+                mare_type=closed_mare.mare_type,
+                stallion_name=closed_mare.stallion_name,
+                pregnancy_date=closed_mare.pregnancy_date
+            )
+        )
+        self.counter_service.record_increments(
+            user_id,
+            **get_delete_counter_increments(delete_type)
+        )
         await self.session.commit()
+        await response_cache.bump_data_version(user_id)
+        await self.counter_service.invalidate_outcome_stats(user_id)
 
-        return {"status": "deleted"}
\ No newline at end of file
+        return {"status": "deleted"}
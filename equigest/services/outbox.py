@@ -0,0 +1,143 @@
+from typing import Optional
+
+from datetime import datetime, timedelta
+
+from fastapi import Depends
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, or_, Row
+
+from equigest.infra.session import get_session
+
+from equigest.models.outbox import OutboxEvent
+
+from equigest.enums.enums import OutboxTopic
+
+class OutboxService:
+    def __init__(self, session: AsyncSession = Depends(get_session)):
+        self.session = session
+
+    def add_event(
+        self,
+        topic: OutboxTopic,
+        aggregate_id: int,
+        payload: dict = None
+    ) -> OutboxEvent:
+        # Only staged in the session: it is committed together with the
+        # caller's own changes.
+        event = OutboxEvent(topic=topic, aggregate_id=aggregate_id, payload=payload or {})
+        self.session.add(event)
+
+        return event
+
+    async def mark_processed(
+        self,
+        topic: OutboxTopic,
+        aggregate_id: int
+    ):
+        await self.session.execute(
+            update(OutboxEvent)
+            .where(
+                OutboxEvent.topic == topic,
+                OutboxEvent.aggregate_id == aggregate_id,
+                OutboxEvent.processed_at.is_(None)
+            )
+            .values(processed_at=func.now())
+        )
+
+    async def has_pending_event(
+        self,
+        topic: OutboxTopic,
+        aggregate_id: int
+    ) -> bool:
+        event_id = await self.session.scalar(
+            select(OutboxEvent.id).where(
+                OutboxEvent.topic == topic,
+                OutboxEvent.aggregate_id == aggregate_id,
+                OutboxEvent.processed_at.is_(None)
+            ).limit(1)
+        )
+        return event_id is not None
+
+    async def claim_event(
+        self,
+        topic: OutboxTopic,
+        aggregate_id: int,
+        lease: timedelta
+    ) -> Optional[Row]:
+        """
+        Mark the pending event of an aggregate as in flight.
+
+        Returns None while another worker holds an unexpired claim. The
+        caller commits before doing the slow work, so no row lock is kept.
+        """
+        result = await self.session.execute(
+            update(OutboxEvent)
+            .where(
+                OutboxEvent.topic == topic,
+                OutboxEvent.aggregate_id == aggregate_id,
+                OutboxEvent.processed_at.is_(None),
+                or_(
+                    OutboxEvent.claimed_at.is_(None),
+                    OutboxEvent.claimed_at < func.now() - lease
+                )
+            )
+            .values(claimed_at=func.now(), attempts=OutboxEvent.attempts + 1)
+            .returning(OutboxEvent.id, OutboxEvent.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        return result.first()
+
+    async def release_event(self, event_id: int, failed: bool = False):
+        # A failed event is kept for inspection but no longer relayed
+        await self.session.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id == event_id)
+            .values(
+                claimed_at=None,
+                failed_at=func.now() if failed else None
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def claim_pending_events(
+        self,
+        topic: OutboxTopic,
+        limit: int = 500,
+        after_id: int = 0,
+        skip_locked: bool = True
+    ) -> list[OutboxEvent]:
+        # SKIP LOCKED lets several drainers run without handing out the same
+        # rows; the locks are held until the caller commits.
+        result = await self.session.scalars(
+            select(OutboxEvent).where(
+                OutboxEvent.topic == topic,
+                OutboxEvent.processed_at.is_(None),
+                OutboxEvent.id > after_id
+            ).order_by(OutboxEvent.id).limit(limit).with_for_update(skip_locked=skip_locked)
+        )
+        return result.all()
+
+    async def mark_events_processed(self, event_ids: list[int]):
+        if event_ids:
+            await self.session.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id.in_(event_ids))
+                .values(processed_at=func.now())
+            )
+
+    async def get_stale_aggregate_ids(
+        self,
+        topic: OutboxTopic,
+        created_before: datetime,
+        limit: int = 500
+    ) -> list[int]:
+        result = await self.session.scalars(
+            select(OutboxEvent.aggregate_id).where(
+                OutboxEvent.topic == topic,
+                OutboxEvent.processed_at.is_(None),
+                OutboxEvent.failed_at.is_(None),
+                OutboxEvent.created_at < created_before
+            ).distinct().limit(limit)
+        )
+        return result.all()
@@ -1,21 +1,37 @@
+from typing import Optional
+
 from datetime import datetime, timedelta
 
-from fastapi import Depends
+from fastapi import Depends, HTTPException, status
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select, update, or_
+from sqlalchemy.dialects.postgresql import insert
 
 from equigest.infra.session import get_session
 
 from equigest.models.user import User
+from equigest.models.processed_billings import ProcessedBilling
 from equigest.schemas.user import UserCreateSchema
 
+from equigest.services.outbox import OutboxService
+
 from equigest.services.exceptions import UserAlreadyExists
 
-from equigest.enums.enums import PaymentAccessStatus
+from equigest.enums.enums import PaymentAccessStatus, OutboxTopic
+
+from equigest.integrations.abacatepay.schemas.create_customer import CreateCustomerSchema
+from equigest.integrations.abacatepay.service import AbacatePayIntegrationService
 
 from equigest.utils.security.hasher import hash_password
-from equigest.utils.security.cryptographer import encrypt_fields
+from equigest.utils.security.cryptographer import encrypt_fields, uncrypt_data, blind_index, reencrypt_data
+
+from equigest.infra.user_cache import user_cache
+
+from equigest.settings import Settings
+
+settings = Settings()
 
 class UserService:
     def __init__(self, session: AsyncSession = Depends(get_session)) -> User:
@@ -26,47 +42,263 @@ class UserService:
         self,
         user: UserCreateSchema
     ):  
-        user.password = hash_password(user.password)
-        encrypt_fields(user, self.sensive_fields)
+        cellphone_blind_index = blind_index(user.cellphone)
+        cpf_cnpj_blind_index = blind_index(user.cpf_cnpj)
 
         existing_user = await self.session.scalar(
-            select(User).where(or_(
+            select(User.id).where(or_(
                 User.username == user.username,
                 User.email == user.email,
-                User.cpf_cnpj == user.cpf_cnpj,
-                User.cellphone == user.cellphone
-            ))
+                User.cpf_cnpj_blind_index == cpf_cnpj_blind_index,
+                User.cellphone_blind_index == cellphone_blind_index
+            )).limit(1)
         )
         if existing_user:
             raise UserAlreadyExists('User already exists')
 
+        user.password = await hash_password(user.password)
+        encrypt_fields(user, self.sensive_fields)
+
         new_user = User(
-            **user.model_dump()
+            **user.model_dump(),
+            cellphone_blind_index=cellphone_blind_index,
+            cpf_cnpj_blind_index=cpf_cnpj_blind_index
         )
 
         self.session.add(new_user)
+        try:
+            await self.session.flush()
+        except IntegrityError:
+            # Registered concurrently after the check above
+            await self.session.rollback()
+            raise UserAlreadyExists('User already exists')
+
+        # The AbacatePay customer is created asynchronously, the outbox row
+        # commits with the user so the request is never lost.
+        OutboxService(self.session).add_event(OutboxTopic.ABACATEPAY_CUSTOMER, new_user.id)
+
         await self.session.commit()
         await self.session.refresh(new_user)
 
         return new_user
 
+    async def ensure_abacatepay_customer(
+        self,
+        user_id: int,
+        abacatepay_service: AbacatePayIntegrationService
+    ) -> Optional[User]:
+        """
+        Create the user's AbacatePay customer unless it already exists.
+
+        Returns None while another request or task holds the provisioning
+        claim. Permanent rejections mark the outbox row as failed so the
+        relay stops re-enqueueing it; 502s are left for the caller to retry.
+        """
+        outbox_service = OutboxService(self.session)
+
+        # The row lock only serializes creating a missing outbox row; it is
+        # released before AbacatePay is called.
+        user = await self.session.scalar(
+            select(User).where(User.id == user_id).with_for_update()
+        )
+        if user is None:
+            return None
+
+        if user.abacatepay_client_id:
+            await outbox_service.mark_processed(OutboxTopic.ABACATEPAY_CUSTOMER, user.id)
+            await self.session.commit()
+            return user
+
+        # Users registered before the outbox have no row to claim
+        if not await outbox_service.has_pending_event(OutboxTopic.ABACATEPAY_CUSTOMER, user.id):
+            outbox_service.add_event(OutboxTopic.ABACATEPAY_CUSTOMER, user.id)
+            await self.session.flush()
+
+        claim = await outbox_service.claim_event(
+            OutboxTopic.ABACATEPAY_CUSTOMER,
+            user.id,
+            timedelta(seconds=settings.ABACATEPAY_CUSTOMER_CLAIM_TIMEOUT_SECONDS)
+        )
+        await self.session.commit()
+        if claim is None:
+            return None
+
+        try:
+            customer = await abacatepay_service.create_customer(
+                CreateCustomerSchema(
+                    name=user.username,
+                    email=user.email,
+                    cellphone=uncrypt_data(user.cellphone),
+                    tax_id=uncrypt_data(user.cpf_cnpj)
+                )
+            )
+        except HTTPException as e:
+            retryable = e.status_code == status.HTTP_502_BAD_GATEWAY
+            await outbox_service.release_event(
+                claim.id,
+                failed=not retryable or claim.attempts >= settings.ABACATEPAY_CUSTOMER_MAX_ATTEMPTS
+            )
+            await self.session.commit()
+            raise
+
+        # The claim makes a concurrent writer unlikely, the condition makes
+        # it harmless: an id that is already set is never overwritten.
+        updated_user = await self.session.scalar(
+            update(User)
+            .where(User.id == user.id, User.abacatepay_client_id.is_(None))
+            .values(abacatepay_client_id=customer['customer_id'])
+            .returning(User)
+            .execution_options(populate_existing=True)
+        )
+        await outbox_service.mark_processed(OutboxTopic.ABACATEPAY_CUSTOMER, user.id)
+        await self.session.commit()
+        await user_cache.invalidate(user.username)
+
+        if updated_user is None:
+            await self.session.refresh(user)
+            return user
+
+        return updated_user
+
+    def evaluate_payment_status(
+        self,
+        user: User,
+        now: datetime
+    ) -> PaymentAccessStatus:
+        is_past_due = user.next_payment_date and user.next_payment_date < now
+
+        if (user.payment_status == PaymentAccessStatus.PAYED or user.payment_status == PaymentAccessStatus.TRIAL) and is_past_due:
+            return PaymentAccessStatus.DEFEATED
+
+        return user.payment_status
+
     async def update_payment_status(
         self,
         user: User,
         now: datetime,
         update_to_paid: bool = False
     ) -> User:
-        is_past_due = user.next_payment_date and user.next_payment_date < now
-
-        if (user.payment_status == PaymentAccessStatus.PAYED or user.payment_status == PaymentAccessStatus.TRIAL) and is_past_due:
-            user.payment_status = PaymentAccessStatus.DEFEATED
+        payment_status = self.evaluate_payment_status(user, now)
 
         if update_to_paid:
             user.payment_status = PaymentAccessStatus.PAYED
             user.next_payment_date += timedelta(days=30)
+        elif payment_status != user.payment_status:
+            user.payment_status = payment_status
+        else:
+            # Nothing transitioned, so the request stays read-only
+            return user
+
+        await self.session.commit()
+        await user_cache.invalidate(user.username)
+
+        return user
+
+    async def apply_paid_billing(
+        self,
+        billing_id: str,
+        abacatepay_client_id: str,
+        now: datetime
+    ) -> Optional[User]:
+        """
+        Credit a paid billing to its customer once.
+
+        Returns None when the customer is unknown or the billing was already
+        credited; AbacatePay redelivers webhooks, so both are expected.
+        """
+        user = await self.session.scalar(
+            select(User)
+            .where(User.abacatepay_client_id == abacatepay_client_id)
+            .with_for_update()
+        )
+        if user is None:
+            return None
+
+        # The billing row commits together with the credit, so a billing is
+        # never credited twice even if the Redis deduplication missed it.
+        inserted_billing_id = await self.session.scalar(
+            insert(ProcessedBilling)
+            .values(billing_id=billing_id, user_id=user.id)
+            .on_conflict_do_nothing()
+            .returning(ProcessedBilling.billing_id)
+        )
+        if inserted_billing_id is None:
+            await self.session.rollback()
+            return None
+
+        return await self.update_payment_status(user, now, True)
 
+    async def expire_overdue_users(
+        self,
+        now: datetime,
+        batch_size: int = 1000
+    ) -> int:
+        expired_count = 0
+
+        while True:
+            overdue_ids = select(User.id).where(
+                User.payment_status.in_([PaymentAccessStatus.PAYED, PaymentAccessStatus.TRIAL]),
+                User.next_payment_date < now
+            ).limit(batch_size).with_for_update(skip_locked=True)
+
+            result = await self.session.execute(
+                update(User)
+                .where(User.id.in_(overdue_ids))
+                .values(payment_status=PaymentAccessStatus.DEFEATED)
+                .returning(User.username)
+                .execution_options(synchronize_session=False)
+            )
+            expired_usernames = result.scalars().all()
+            await self.session.commit()
+            await user_cache.invalidate(*expired_usernames)
+
+            expired_count += len(expired_usernames)
+            if len(expired_usernames) < batch_size:
+                return expired_count
+
+    async def reencrypt_sensitive_fields(
+        self,
+        after_id: int,
+        batch_size: int = 200
+    ) -> tuple[int, int]:
+        """
+        Re-encrypt one id-ordered batch of users with the primary Fernet key.
+
+        Returns the last id read, to resume from, and how many users were
+        rewritten; users already on the primary key are skipped.
+        """
+        users = (await self.session.execute(
+            select(User.id, User.cellphone, User.cpf_cnpj)
+            .where(User.id > after_id)
+            .order_by(User.id)
+            .limit(batch_size)
+        )).all()
+        if not users:
+            return after_id, 0
+
+        values = []
+        for user in users:
+            fields = {
+                field: reencrypted
+                for field in self.sensive_fields
+                if (reencrypted := reencrypt_data(getattr(user, field))) is not None
+            }
+            if fields:
+                values.append({'id': user.id, **fields})
+
+        if values:
+            await self.session.execute(update(User), values)
+        await self.session.commit()
+
+        return users[-1].id, len(values)
+
+    async def update_password_hash(
+        self,
+        user: User,
+        password_hash: str
+    ) -> User:
+        user.password = password_hash
         await self.session.commit()
-        await self.session.refresh(user)
 
         return user
 
@@ -18,6 +18,7 @@ class Settings(BaseSettings):
     ABACATEPAY_DEV_APIKEY: str
     DB_HOST: str
     FERNET_SECRET_KEY: str
+    BLIND_INDEX_SECRET_KEY: str
     ABACATEPAY_PROD_APIKEY: str
     ABACATEPAY_WEBHOOK_SECURE_PROD: str
     ENVIRONMENT: str
@@ -27,6 +28,48 @@ class Settings(BaseSettings):
     COMPLET_DEV_URL_ABACATEPAY: str
     REDIS_URL_DEV: str
 
+    SUBSCRIPTION_SWEEP_INTERVAL_SECONDS: int = 600
+    COUNTERS_DRAIN_INTERVAL_SECONDS: int = 10
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 5
+    USER_CACHE_LOCAL_MAXSIZE: int = 1024
+    USER_CACHE_REDIS_TTL_SECONDS: int = 300
+    OUTCOME_STATS_CACHE_TTL_SECONDS: int = 3600
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    CHANGES_SETTLE_SECONDS: int = 5
+    MARE_IMPORT_MAX_ROWS: int = 5000
+    MARE_IMPORT_MAX_BYTES: int = 5 * 1024 * 1024
+    MARE_EXPORT_BATCH_SIZE: int = 500
+    FERNET_ROTATION_BATCH_SIZE: int = 200
+    FERNET_ROTATION_PAUSE_SECONDS: float = 0.5
+    FERNET_ROTATION_LOCK_TTL_SECONDS: int = 300
+    FERNET_ROTATION_CHECKPOINT_TTL_SECONDS: int = 7 * 24 * 3600
+    WEBHOOK_DEDUPLICATION_TTL_SECONDS: int = 7 * 24 * 3600
+    CUSTOMER_PROVISIONING_RELAY_INTERVAL_SECONDS: int = 300
+    ABACATEPAY_CUSTOMER_MAX_ATTEMPTS: int = 10
+    ABACATEPAY_CUSTOMER_CLAIM_TIMEOUT_SECONDS: int = 120
+    CELERY_WORKER_CONCURRENCY: int = 8
+    CELERY_WORKER_PREFETCH_MULTIPLIER: int = 1
+
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_WARM_CONNECTIONS: int = 2
+
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASHING_WORKERS: int = 2
+    PASSWORD_HASHING_MAX_PENDING: int = 32
+
+    ABACATEPAY_BASE_URL: str = 'https://api.abacatepay.com/v1'
+    ABACATEPAY_TIMEOUT_SECONDS: float = 10.0
+    ABACATEPAY_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    ABACATEPAY_MAX_CONNECTIONS: int = 20
+    ABACATEPAY_MAX_RETRIES: int = 2
+    ABACATEPAY_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    ABACATEPAY_CIRCUIT_RESET_SECONDS: float = 30.0
+
     ABACATEPAY_KEY: Optional[str] = None
     RETURN_URL: Optional[str] = None
     COMPLET_URL: Optional[str] = None
@@ -1,24 +1,56 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+
 from fastapi import FastAPI
 
 from fastapi.middleware.cors import CORSMiddleware
 
 from fastapi_pagination import add_pagination
 
+from sqlalchemy import text
+
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 
 from equigest.settings import Settings
 
+from equigest.integrations.abacatepay.client import abacatepay_client
+
+from equigest.infra.redis_client import async_redis_client
+from equigest.infra.database import engine
+
 settings = Settings()
 REDIS_URL = settings.REDIS_URL
 
 limiter = Limiter(key_func=get_remote_address, storage_uri=REDIS_URL)
 
+async def warm_database_pool(connection_count: int):
+    # Holding the connections together makes the pool open that many
+    # instead of reusing the first one.
+    async with AsyncExitStack() as stack:
+        for _ in range(connection_count):
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.execute(text('SELECT 1'))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Teardown runs in reverse order and every step runs even if an earlier
+    # one fails, e.g. closing the AbacatePay client after Redis failed.
+    async with AsyncExitStack() as stack:
+        stack.push_async_callback(engine.dispose)
+        stack.push_async_callback(abacatepay_client.close)
+        stack.push_async_callback(async_redis_client.close)
+
+        await abacatepay_client.open()
+        await warm_database_pool(settings.DB_POOL_WARM_CONNECTIONS)
+        await async_redis_client.ping()
+        yield
+
 def setup_app():
     app = FastAPI(
         title='EquiGest',
         description='A mare management service',
-        version='1.2.2'
+        version='1.2.2',
+        lifespan=lifespan
     )
 
     app.add_middleware(
@@ -27,6 +59,7 @@ def setup_app():
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag"],
     )
 
     add_pagination(app)
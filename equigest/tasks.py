@@ -1,51 +1,223 @@
 import asyncio
+import logging
+import uuid
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+
+from celery.signals import worker_shutdown
+from celery.utils.time import get_exponential_backoff_interval
+
+from fastapi import HTTPException, status
+
+from sqlalchemy.exc import SQLAlchemyError
+
+import redis.asyncio as redis
 
 from equigest.infra.session import get_session
+from equigest.infra.redis_client import async_redis_client
+from equigest.infra.worker_loop import worker_loop
 
 from equigest.celery import celery_app
 
 from equigest.services.user import (
     UserService
 )
+from equigest.services.outbox import OutboxService
+from equigest.services.counters import PregnancyCounterService
 
-worker_loop = None
+from equigest.integrations.abacatepay.service import get_abacatepay_integration_service
 
-def get_worker_loop():
-    global worker_loop
-    if worker_loop is None or worker_loop.is_closed():
-        worker_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(worker_loop)
-    return worker_loop
+from equigest.enums.enums import OutboxTopic
 
-@celery_app.task
+from equigest.utils.security.cryptographer import PRIMARY_KEY_FINGERPRINT
+
+from equigest.settings import Settings
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+FERNET_ROTATION_LOCK_KEY = 'fernet-rotation:lock'
+
+def fernet_rotation_checkpoint_key() -> str:
+    return f'fernet-rotation:{PRIMARY_KEY_FINGERPRINT}:last-user-id'
+
+@worker_shutdown.connect
+def close_worker_loop(**kwargs):
+    worker_loop.shutdown()
+
+def billing_deduplication_key(billing_id: str) -> str:
+    return f"abacatepay:billing:{billing_id}"
+
+class BillingPaidTask(celery_app.Task):
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        # Retries are exhausted: drop the webhook deduplication key so the
+        # next AbacatePay redelivery is enqueued instead of answered as done.
+        billing_id = args[0].get('data', {}).get('billing', {}).get('id') if args else None
+        if not billing_id:
+            return
+        try:
+            worker_loop.run(async_redis_client.delete(billing_deduplication_key(billing_id)))
+        except redis.RedisError:
+            logger.exception('Failed to release deduplication key of billing %s', billing_id)
+
+# processed_billings makes the credit idempotent, so a redelivered or
+# retried task is always safe to run again
+@celery_app.task(
+    base=BillingPaidTask,
+    autoretry_for=(SQLAlchemyError, redis.RedisError, OSError),
+    retry_backoff=True,
+    retry_jitter=True,
+    max_retries=8,
+    acks_late=True,
+    reject_on_worker_lost=True
+)
 def process_billing_paid(payload):
     billing_data = payload.get('data', {}).get('billing', {})
     billing_status = billing_data.get('status')
     if billing_status != "PAID":
         return
 
-    customer_data = billing_data.get('customer', {})
+    billing_id = billing_data.get('id')
+    customer_id = billing_data.get('customer', {}).get('id')
+    if not billing_id or not customer_id:
+        return
+
+    async def run():
+        async for session in get_session():
+            user_service = UserService(session)
+            await user_service.apply_paid_billing(
+                billing_id,
+                customer_id,
+                datetime.now(timezone.utc)
+            )
+    worker_loop.run(run())
+
+@celery_app.task
+def expire_overdue_subscriptions():
+    async def run():
+        async for session in get_session():
+            user_service = UserService(session)
+            expired_count = await user_service.expire_overdue_users(datetime.now(timezone.utc))
+        return expired_count
+    return worker_loop.run(run())
+
 
-    customer_metadata = customer_data.get('metadata', {})
-    customer_name = customer_metadata.get('name', {})
+# AbacatePay failures are reported by the integration service as
+# HTTPExceptions: 502s are transient and retried, anything else is a
+# rejection that ensure_abacatepay_customer already marked as failed.
+@celery_app.task(
+    bind=True,
+    max_retries=8
+)
+def provision_abacatepay_customer(self, user_id: int):
+    async def run():
+        async for session in get_session():
+            user_service = UserService(session)
+            await user_service.ensure_abacatepay_customer(
+                user_id,
+                get_abacatepay_integration_service()
+            )
+    try:
+        worker_loop.run(run())
+    except HTTPException as e:
+        if e.status_code != status.HTTP_502_BAD_GATEWAY:
+            logger.warning('AbacatePay rejected the customer of user %s: %s', user_id, e.detail)
+            return
+        # A manual retry gets no autoretry backoff, so it is computed here
+        raise self.retry(
+            exc=e,
+            countdown=get_exponential_backoff_interval(
+                factor=1,
+                retries=self.request.retries,
+                maximum=600,
+                full_jitter=True
+            )
+        )
 
+@celery_app.task
+def relay_pending_customer_provisioning():
     async def run():
         async for session in get_session():
-            try:
-                print('In Session Try-Catch')
-                user_service = UserService(session)
-                user = await user_service.get_user(customer_name)
-                if user:
-                    await user_service.update_payment_status(
-                        user,
-                        datetime.now(timezone.utc),
-                        True
-                    )
-            finally:
-                print('In Session Finally')
-                await session.close()
-                print('Session Closed With Success')
-    loop = get_worker_loop()
-    loop.run_until_complete(run())
\ No newline at end of file
+            outbox_service = OutboxService(session)
+            user_ids = await outbox_service.get_stale_aggregate_ids(
+                OutboxTopic.ABACATEPAY_CUSTOMER,
+                datetime.now(timezone.utc) - timedelta(minutes=10)
+            )
+        return user_ids
+    for user_id in worker_loop.run(run()):
+        provision_abacatepay_customer.delay(user_id)
+
+@celery_app.task
+def drain_pregnancy_counters():
+    async def run():
+        async for session in get_session():
+            counter_service = PregnancyCounterService(session)
+            drained_count = await counter_service.drain_outbox()
+        return drained_count
+    return worker_loop.run(run())
+
+@celery_app.task
+def rotate_fernet_keys():
+    # Run after putting the new key first in FERNET_SECRET_KEY. The
+    # checkpoint lets a restarted run resume where the previous one stopped;
+    # the old key can be removed once a run finishes.
+    async def run():
+        lock_token = uuid.uuid4().hex
+        if not await async_redis_client.set(
+            FERNET_ROTATION_LOCK_KEY,
+            lock_token,
+            ex=settings.FERNET_ROTATION_LOCK_TTL_SECONDS,
+            nx=True
+        ):
+            logger.info('Fernet key rotation is already running')
+            return 0
+
+        try:
+            return await rotate(lock_token)
+        finally:
+            if await async_redis_client.get(FERNET_ROTATION_LOCK_KEY) == lock_token.encode():
+                await async_redis_client.delete(FERNET_ROTATION_LOCK_KEY)
+
+    async def rotate(lock_token: str):
+        # The checkpoint belongs to the primary key it rotates to, so one left
+        # by an interrupted rotation to another key is never resumed.
+        checkpoint_key = fernet_rotation_checkpoint_key()
+        checkpoint = await async_redis_client.get(checkpoint_key)
+        last_id = int(checkpoint) if checkpoint else 0
+        rotated_count = 0
+
+        async for session in get_session():
+            user_service = UserService(session)
+            while True:
+                next_id, rotated = await user_service.reencrypt_sensitive_fields(
+                    last_id,
+                    settings.FERNET_ROTATION_BATCH_SIZE
+                )
+                if next_id == last_id:
+                    break
+
+                last_id = next_id
+                rotated_count += rotated
+                await async_redis_client.set(
+                    checkpoint_key,
+                    str(last_id),
+                    ex=settings.FERNET_ROTATION_CHECKPOINT_TTL_SECONDS
+                )
+
+                # Keep the lock while batches make progress; stop if it
+                # expired and another run took over.
+                if await async_redis_client.get(FERNET_ROTATION_LOCK_KEY) != lock_token.encode():
+                    logger.warning('Fernet key rotation lost its lock at user %s', last_id)
+                    return rotated_count
+                await async_redis_client.set(
+                    FERNET_ROTATION_LOCK_KEY,
+                    lock_token,
+                    ex=settings.FERNET_ROTATION_LOCK_TTL_SECONDS
+                )
+
+                # Gives way to the application between batches
+                await asyncio.sleep(settings.FERNET_ROTATION_PAUSE_SECONDS)
+
+        await async_redis_client.delete(checkpoint_key)
+        return rotated_count
+    return worker_loop.run(run())
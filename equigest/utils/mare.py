@@ -1,18 +1,21 @@
 from fastapi import HTTPException, status
 
 from dateutil.relativedelta import relativedelta
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta, timezone, date
 
-from equigest.models.mares import Mare
+from equigest.models.mares import Mare, BIRTH_FORECAST_DAYS
+from equigest.models.mare_events import MareEvent
 
-from equigest.enums.enums import DeleteType
+from equigest.enums.enums import DeleteType, MareEventKind, MareType
 
-from equigest.infra.redis_client import async_redis_client
+P4_INTERVAL_DAYS = 15
+P4_WINDOW_DAYS = 105
+HERPES_VACCINE_MONTHS = (5, 7, 9)
 
 def get_birth_forecast(
     pregnancy_date: datetime
 ) -> datetime:
-    return pregnancy_date + timedelta(days=335)
+    return pregnancy_date + timedelta(days=BIRTH_FORECAST_DAYS)
 
 def get_p4_schedule(
     pregnancy_date: datetime
@@ -20,11 +23,11 @@ def get_p4_schedule(
     schedule = []
 
     current_date = pregnancy_date
-    end_date = pregnancy_date + timedelta(days=105)
+    end_date = pregnancy_date + timedelta(days=P4_WINDOW_DAYS)
 
     while current_date <= end_date:
         schedule.append(current_date)
-        current_date += timedelta(days=15)
+        current_date += timedelta(days=P4_INTERVAL_DAYS)
     
     return schedule
 
@@ -32,9 +35,8 @@ def get_herpes_vaccine_schedule(
     pregnancy_date: datetime
 ) -> list[datetime]:
     return [
-        pregnancy_date + relativedelta(months=5),
-        pregnancy_date + relativedelta(months=7),
-        pregnancy_date + relativedelta(months=9)
+        pregnancy_date + relativedelta(months=months)
+        for months in HERPES_VACCINE_MONTHS
     ]
 
 def get_managment_schedule(
@@ -46,11 +48,32 @@ def get_managment_schedule(
         "P4": get_p4_schedule(pregnancy_date),
     }
 
-def is_in_p4_range(pregnancy_date: datetime, start_date: date, end_date: date) -> bool:
-    return any(start_date <= d.date() <= end_date for d in get_p4_schedule(pregnancy_date))
+def _utc_day(moment: datetime) -> date:
+    if moment.tzinfo is None:
+        return moment.date()
+    return moment.astimezone(timezone.utc).date()
 
-def is_in_herpes_range(pregnancy_date: datetime, start_date: date, end_date: date) -> bool:
-    return any(start_date <= d.date() <= end_date for d in get_herpes_vaccine_schedule(pregnancy_date))
+def build_mare_events(mare: Mare) -> list[MareEvent]:
+    if mare.pregnancy_date is None:
+        return []
+
+    schedule = {
+        MareEventKind.HERPES_VACCINE: get_herpes_vaccine_schedule(mare.pregnancy_date),
+        MareEventKind.BIRTH_FORECAST: [get_birth_forecast(mare.pregnancy_date)],
+    }
+    if mare.mare_type == MareType.RECEIVER:
+        schedule[MareEventKind.P4] = get_p4_schedule(mare.pregnancy_date)
+
+    return [
+        MareEvent(
+            mare_id=mare.id,
+            user_owner=mare.user_owner,
+            event_kind=event_kind,
+            due_date=_utc_day(due_date)
+        )
+        for event_kind, due_dates in schedule.items()
+        for due_date in due_dates
+    ]
 
 def check_mare_ownership(mare: Mare, user_id: int):
     if mare.user_owner != user_id:
@@ -59,16 +82,14 @@ def check_mare_ownership(mare: Mare, user_id: int):
             detail="You're not allowed to access this mare."
         )
     
-async def update_success_or_fail_counters(user_id: int, delete_type: DeleteType):
+def get_delete_counter_increments(delete_type: DeleteType) -> dict[str, int]:
     if delete_type == DeleteType.SUCCESS_PREGNANCY:
-        await async_redis_client.hincryby_fields(
-            f"user:{user_id}",
-            successful_pregnancies=1,
-            pregnancies_in_progress=-1
-        )
-    else:
-        await async_redis_client.hincryby_fields(
-            f"user:{user_id}",
-            failed_pregnancies=1,
-            pregnancies_in_progress=-1
-        )
\ No newline at end of file
+        return {
+            'successful_pregnancies': 1,
+            'pregnancies_in_progress': -1
+        }
+
+    return {
+        'failed_pregnancies': 1,
+        'pregnancies_in_progress': -1
+    }
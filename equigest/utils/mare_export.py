@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+
+from typing import AsyncIterator
+
+from fastapi.encoders import jsonable_encoder
+
+from equigest.models.mares import Mare
+
+from equigest.schemas.mare import MareSchema
+
+from equigest.enums.enums import ExportFormat, MareType
+
+from equigest.utils.mare import get_managment_schedule
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: 'text/csv',
+    ExportFormat.NDJSON: 'application/x-ndjson',
+}
+
+MARE_COLUMNS = list(MareSchema.model_fields)
+SCHEDULE_COLUMNS = ['herpes_vaccine', 'birth_forecast', 'P4']
+
+def _export_record(mare: Mare, include_schedule: bool) -> dict:
+    record = jsonable_encoder(MareSchema.model_validate(mare, from_attributes=True))
+    if include_schedule and mare.pregnancy_date is not None:
+        schedule = get_managment_schedule(mare.pregnancy_date)
+        if mare.mare_type == MareType.HEADQUARTERS:
+            schedule.pop('P4', None)
+        record['managment_schedule'] = jsonable_encoder(schedule)
+
+    return record
+
+def _csv_row(record: dict, include_schedule: bool) -> list:
+    row = [record[column] for column in MARE_COLUMNS]
+    if include_schedule:
+        schedule = record.get('managment_schedule', {})
+        for column in SCHEDULE_COLUMNS:
+            dates = schedule.get(column, [])
+            # Lists are flattened into one cell so the file stays one mare per row
+            row.append(';'.join(dates) if isinstance(dates, list) else dates)
+
+    return row
+
+async def export_mares(
+    mares: AsyncIterator[Mare],
+    export_format: ExportFormat,
+    include_schedule: bool,
+    batch_size: int
+) -> AsyncIterator[str]:
+    """Format the mares as they come, sending one chunk per batch_size rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == ExportFormat.CSV:
+        writer.writerow(MARE_COLUMNS + (SCHEDULE_COLUMNS if include_schedule else []))
+
+    rows_in_buffer = 0
+    async for mare in mares:
+        record = _export_record(mare, include_schedule)
+        if export_format == ExportFormat.CSV:
+            writer.writerow(_csv_row(record, include_schedule))
+        else:
+            buffer.write(json.dumps(record) + '\n')
+
+        rows_in_buffer += 1
+        if rows_in_buffer >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows_in_buffer = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
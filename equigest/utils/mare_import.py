@@ -0,0 +1,133 @@
+import csv
+import json
+
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, status
+
+from pydantic import ValidationError
+
+from equigest.schemas.mare import MareCreateOrEditSchema, MareImportErrorSchema
+
+CSV_CONTENT_TYPE = 'text/csv'
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+async def read_import_lines(stream: AsyncIterator[bytes], max_bytes: int) -> list[str]:
+    """Split the request body into lines as it arrives, up to max_bytes."""
+    lines = []
+    pending = b''
+    received = 0
+
+    try:
+        async for chunk in stream:
+            received += len(chunk)
+            if received > max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f'Import files are limited to {max_bytes} bytes'
+                )
+
+            pending += chunk
+            *complete, pending = pending.split(b'\n')
+            # Line endings are kept so csv can rebuild quoted multi-line fields
+            lines.extend(line.decode() + '\n' for line in complete)
+
+        if pending:
+            lines.append(pending.decode())
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Import files must be UTF-8 encoded'
+        )
+
+    if lines:
+        lines[0] = lines[0].removeprefix('\ufeff')
+
+    return lines
+
+def _validate_row(
+    line_number: int,
+    row: dict,
+    seen_names: set[str],
+    mares: list[tuple[int, MareCreateOrEditSchema]],
+    errors: list[MareImportErrorSchema]
+):
+    # Empty CSV cells mean "not informed", like an omitted NDJSON key
+    row = {key: value for key, value in row.items() if value not in ('', None)}
+
+    try:
+        mare = MareCreateOrEditSchema.model_validate(row)
+    except ValidationError as e:
+        errors.append(MareImportErrorSchema(
+            line=line_number,
+            errors=[f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()]
+        ))
+        return
+
+    if mare.mare_name in seen_names:
+        errors.append(MareImportErrorSchema(
+            line=line_number,
+            errors=[f'Mare with name "{mare.mare_name}" is repeated in the file']
+        ))
+        return
+
+    seen_names.add(mare.mare_name)
+    mares.append((line_number, mare))
+
+def _csv_rows(lines: list[str]):
+    reader = csv.DictReader(lines)
+    # Reading the header first makes line_num point at the first row
+    reader.fieldnames
+    row_start = reader.line_num + 1
+    for row in reader:
+        yield row_start, row
+        row_start = reader.line_num + 1
+
+def get_import_media_type(content_type: Optional[str]) -> str:
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    if media_type not in (CSV_CONTENT_TYPE, NDJSON_CONTENT_TYPE):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f'Send the mares as {CSV_CONTENT_TYPE} or {NDJSON_CONTENT_TYPE}'
+        )
+
+    return media_type
+
+def parse_mare_import(
+    lines: list[str],
+    media_type: str,
+    max_rows: int
+) -> tuple[list[tuple[int, MareCreateOrEditSchema]], list[MareImportErrorSchema]]:
+    mares = []
+    errors = []
+    seen_names = set()
+
+    if media_type == CSV_CONTENT_TYPE:
+        rows = _csv_rows(lines)
+    else:
+        rows = (
+            (line_number, line)
+            for line_number, line in enumerate(lines, start=1)
+            if line.strip()
+        )
+
+    for row_count, (line_number, row) in enumerate(rows, start=1):
+        if row_count > max_rows:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f'Import files are limited to {max_rows} mares'
+            )
+
+        if isinstance(row, str):
+            try:
+                row = json.loads(row)
+            except json.JSONDecodeError as e:
+                errors.append(MareImportErrorSchema(line=line_number, errors=[f'Invalid JSON: {e.msg}']))
+                continue
+            if not isinstance(row, dict):
+                errors.append(MareImportErrorSchema(line=line_number, errors=['Each line must be a JSON object']))
+                continue
+
+        _validate_row(line_number, row, seen_names, mares, errors)
+
+    return mares, errors
@@ -0,0 +1,96 @@
+import base64
+import binascii
+import json
+
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+from fastapi_pagination import Params, Page
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, ColumnElement, select, func, tuple_
+
+from equigest.schemas.pagination import CursorParams, CursorPage
+
+def encode_cursor(values: list) -> str:
+    serialized = [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    return base64.urlsafe_b64encode(json.dumps(serialized).encode()).decode()
+
+def decode_cursor(cursor: str, order_columns: list[ColumnElement]) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(order_columns):
+            raise ValueError('Cursor does not match the ordering')
+
+        return [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else value
+            for column, value in zip(order_columns, values)
+        ]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid pagination cursor'
+        )
+
+async def paginate(
+    session: AsyncSession,
+    query: Select,
+    params: Params,
+    include_total: bool = True
+) -> Page:
+    offset = (params.page - 1) * params.size
+    limit = params.size
+
+    if not include_total:
+        result = await session.execute(query.offset(offset).limit(limit))
+        return Page.create(result.scalars().all(), total=None, params=params)
+
+    # The total comes back with the page through COUNT(*) OVER(), so rows
+    # outside the page are never hydrated.
+    windowed_query = query.add_columns(
+        func.count().over().label('total_count')
+    ).offset(offset).limit(limit)
+
+    result = await session.execute(windowed_query)
+    rows = result.all()
+
+    if rows:
+        total_count = rows[0].total_count
+    elif offset:
+        # Past the last page there is no row to carry the window value
+        total_count = await session.scalar(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        )
+    else:
+        total_count = 0
+
+    items = [row[0] for row in rows]
+
+    return Page.create(items, total=total_count, params=params)
+
+async def paginate_by_cursor(
+    session: AsyncSession,
+    query: Select,
+    order_columns: list[ColumnElement],
+    params: CursorParams
+) -> CursorPage:
+    if params.cursor:
+        last_values = decode_cursor(params.cursor, order_columns)
+        query = query.where(tuple_(*order_columns) > tuple_(*last_values))
+
+    # One extra row tells whether there is a next page without a COUNT
+    result = await session.execute(query.limit(params.size + 1))
+    items = result.scalars().all()
+
+    next_cursor = None
+    if len(items) > params.size:
+        items = items[:params.size]
+        next_cursor = encode_cursor([
+            getattr(items[-1], column.key) for column in order_columns
+        ])
+
+    return CursorPage(items=items, size=params.size, next_cursor=next_cursor)
@@ -1,13 +1,23 @@
-from typing import Any, List
+import hashlib
+import hmac
 
-from cryptography.fernet import Fernet
+from typing import Any, List, Optional
+
+from cryptography.fernet import Fernet, MultiFernet, InvalidToken
 
 from equigest.settings import Settings
 
 settings = Settings()
-FERNET_SECRET_KEY = settings.FERNET_SECRET_KEY
+# Comma-separated to rotate keys: the first one encrypts, all of them decrypt
+FERNET_SECRET_KEYS = [key.strip() for key in settings.FERNET_SECRET_KEY.split(',') if key.strip()]
+
+BLIND_INDEX_SECRET_KEY = settings.BLIND_INDEX_SECRET_KEY
 
-fernet = Fernet(FERNET_SECRET_KEY.encode('utf-8'))
+primary_fernet = Fernet(FERNET_SECRET_KEYS[0].encode('utf-8'))
+fernet = MultiFernet([primary_fernet] + [Fernet(key.encode('utf-8')) for key in FERNET_SECRET_KEYS[1:]])
+
+# Identifies the primary key without revealing it, e.g. in Redis key names
+PRIMARY_KEY_FINGERPRINT = hashlib.sha256(FERNET_SECRET_KEYS[0].encode('utf-8')).hexdigest()[:16]
 
 def encrypt_data(data: str):
     return fernet.encrypt(data.encode()).decode()
@@ -15,6 +25,26 @@ def encrypt_data(data: str):
 def uncrypt_data(data: str):
     return fernet.decrypt(data.encode()).decode()
 
+def reencrypt_data(data: str) -> Optional[str]:
+    """Return data encrypted with the primary key, or None if it already is."""
+    try:
+        primary_fernet.decrypt(data.encode())
+        return None
+    except InvalidToken:
+        return fernet.rotate(data.encode()).decode()
+
+def blind_index(data: str) -> str:
+    # Fernet ciphertexts are randomized, so lookups go through a keyed hash
+    # of the value. Punctuation and case are dropped first so that
+    # "123.456.789-00" and "12345678900" collide as they should.
+    normalized = ''.join(char for char in data if char.isalnum()).lower()
+
+    return hmac.new(
+        BLIND_INDEX_SECRET_KEY.encode('utf-8'),
+        normalized.encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+
 def process_fields(instance: Any, fields: List[str], processor: callable):
     for field in fields:
         value = getattr(instance, field, None)
@@ -1,11 +1,53 @@
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from equigest.settings import Settings
+
+from equigest.services.exceptions import PasswordHashingBusy
+
+settings = Settings()
+
+pwd_context = PasswordHash((
+    Argon2Hasher(
+        time_cost=settings.ARGON2_TIME_COST,
+        memory_cost=settings.ARGON2_MEMORY_COST,
+        parallelism=settings.ARGON2_PARALLELISM,
+    ),
+))
+
+# Argon2 releases the GIL, so a small thread pool keeps it off the event loop
+# without the memory cost of extra processes.
+hashing_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    thread_name_prefix='argon2',
+)
+pending_hashing_jobs = 0
+
+
+async def run_in_hashing_pool(func: Callable, *args):
+    global pending_hashing_jobs
+
+    if pending_hashing_jobs >= settings.PASSWORD_HASHING_MAX_PENDING:
+        raise PasswordHashingBusy('Too many pending password hashing jobs')
 
-pwd_context = PasswordHash.recommended()
+    pending_hashing_jobs += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(hashing_executor, func, *args)
+    finally:
+        pending_hashing_jobs -= 1
 
 
-def hash_password(password: str):
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    return await run_in_hashing_pool(pwd_context.hash, password)
 
 
-def check_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    # The new hash is only returned when the stored one was made with
+    # different Argon2 parameters than the configured ones.
+    return await run_in_hashing_pool(pwd_context.verify_and_update, plain_password, hashed_password)
@@ -12,6 +12,8 @@ from equigest.services.user import (
     UserService,
 )
 
+from equigest.infra.user_cache import user_cache
+
 
 settings = Settings()
 SECRET_KEY = settings.SECRET_KEY
@@ -51,9 +53,15 @@ async def get_current_user(
     except jwt.DecodeError:
         raise credentials_exception
 
+    user = await user_cache.get(subject_username)
+    if user is not None:
+        return user
+
     user = await user_service.get_user(subject_username)
 
     if user is None:
         raise credentials_exception
 
+    await user_cache.set(user)
+
     return user
\ No newline at end of file
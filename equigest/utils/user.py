@@ -18,13 +18,15 @@ async def validate_paid_user(
     user_service: Annotated[UserService, Depends()],
     current_user: Annotated[User, Depends(get_current_user)],
 ) -> User:
-    existing_user = await user_service.update_payment_status(current_user, datetime.now(timezone.utc))
+    # Expired subscriptions are persisted by the expire_overdue_subscriptions
+    # beat task; here the status is only evaluated, never written.
+    payment_status = user_service.evaluate_payment_status(current_user, datetime.now(timezone.utc))
 
-    if existing_user.payment_status == PaymentAccessStatus.DEFEATED:
+    if payment_status == PaymentAccessStatus.DEFEATED:
         raise HTTPException(
         status_code=status.HTTP_402_PAYMENT_REQUIRED,
         detail='System access time expired. Make payment to resume use',
         headers={'X-Payment-Required': 'true'}
     )
 
-    return existing_user
\ No newline at end of file
+    return current_user
\ No newline at end of file
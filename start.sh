@@ -1,8 +1,25 @@
 #!/bin/sh
 
-uvicorn equigest.app:app --host 0.0.0.0 --port 8000 --reload &
-celery -A equigest.celery.celery_app worker --loglevel=debug --without-gossip --pool=solo
+# API only; the Celery worker and beat start from worker.sh and their own
+# compose services.
+if [ "$ENVIRONMENT" = "production" ]; then
+    # Each worker is its own process with its own engine pool, so the
+    # database sees up to WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    # connections.
+    # Proxy headers are only trusted from FORWARDED_ALLOW_IPS, which uvicorn
+    # reads itself and defaults to 127.0.0.1. Set it to the real proxy
+    # addresses; trusting every client would let them pick the address the
+    # rate limits key on.
+    exec uvicorn equigest.app:app \
+        --host 0.0.0.0 \
+        --port "${PORT:-8000}" \
+        --workers "${WEB_CONCURRENCY:-$(nproc)}" \
+        --loop uvloop \
+        --http httptools \
+        --proxy-headers \
+        --timeout-keep-alive "${KEEP_ALIVE_TIMEOUT_SECONDS:-5}" \
+        --timeout-graceful-shutdown "${GRACEFUL_SHUTDOWN_TIMEOUT_SECONDS:-30}" \
+        --no-server-header
+fi
 
-wait -n
-
-exit $?
+exec uvicorn equigest.app:app --host 0.0.0.0 --port 8000 --reload
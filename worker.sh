@@ -0,0 +1,6 @@
+#!/bin/sh
+
+# Pool and concurrency come from equigest.celery (CELERY_WORKER_* settings).
+# Beat runs as its own service so scaling workers never schedules periodic
+# tasks twice.
+exec celery -A equigest.celery.celery_app worker --loglevel=info --without-gossip